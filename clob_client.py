@@ -1,13 +1,51 @@
 import os
+import requests
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
 
 from py_clob_client.client import ClobClient
+from py_clob_client.http_helpers import helpers
 from py_clob_client.clob_types import ApiCreds
+from py_clob_client.exceptions import PolyApiException
 from py_clob_client.constants import POLYGON
 
 
+def use_keep_alive_session(pool_maxsize: int = 8) -> None:
+    # The client's get/post/delete all go through helpers.request, which calls
+    # requests.request and so opens a new TCP+TLS connection per call. Swap in
+    # the same request routed through one pooled Session; the requests module
+    # itself is left alone. Written against py-clob-client 0.18.0 (pinned)
+    if getattr(helpers.request, 'keep_alive', False):
+        return
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+
+    def request(endpoint: str, method: str, headers=None, data=None):
+        try:
+            headers = helpers.overloadHeaders(method, headers)
+            resp = session.request(
+                method=method, url=endpoint, headers=headers, json=data if data else None
+            )
+            if resp.status_code != 200:
+                raise PolyApiException(resp)
+
+            try:
+                return resp.json()
+            except requests.JSONDecodeError:
+                return resp.text
+
+        except requests.RequestException:
+            raise PolyApiException(error_msg="Request exception!")
+
+    request.keep_alive = True
+    helpers.request = request
+
+
 def create_clob_client() -> ClobClient:
     load_dotenv()
+    use_keep_alive_session()
 
     chain_id = POLYGON
     host = os.getenv('HOST')
@@ -1,20 +1,32 @@
 import threading
-import queue
 import requests
 import numpy as np
 import time
 from datetime import datetime
 import subprocess
 import os
-import json
+import orjson
 import sys
 import logging
+import atexit
 import argparse
 import traceback
-from logging.handlers import RotatingFileHandler
+import wave
+import collections
+import copy
+import queue
+import concurrent.futures
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 import backoff
 
-from vosk import Model, KaldiRecognizer
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from vosk import Model, KaldiRecognizer, BatchModel, BatchRecognizer, GpuInit
+import av
+import ahocorasick
 import wget
 import zipfile
 from py_clob_client.clob_types import OrderArgs
@@ -25,6 +37,7 @@ sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
 # Import configuration loader
 from utils.config_loader import get_config
+from helpers.trading_support import MarketClaims, SignedOrderPool, RecordWriter
 
 # Get configuration
 config = get_config()
@@ -33,24 +46,43 @@ config = get_config()
 for path_name, path in config.settings.get('paths', {}).items():
     os.makedirs(path, exist_ok=True)
 
-# Configure logging
+# Configure logging; one formatter and one console handler are shared by every logger
+log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+# The console only shows warnings unless debug is enabled; the log files keep everything
+console_handler = logging.StreamHandler()
+console_handler.setFormatter(log_formatter)
+console_handler.setLevel(config.get_setting('app', 'console_log_level', 'WARNING'))
+
 def setup_logger(name, log_file, level=logging.INFO):
     """Function to set up a logger with a specific name and file"""
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    
     # File handler with rotation (10MB max size, keep 5 backups)
-    file_handler = RotatingFileHandler(log_file, maxBytes=10*1024*1024, backupCount=5)
-    file_handler.setFormatter(formatter)
+    file_handler = RotatingFileHandler(log_file, maxBytes=10*1024*1024, backupCount=5, delay=True)
+    file_handler.setFormatter(log_formatter)
     
-    # Console handler
-    console_handler = logging.StreamHandler()
-    console_handler.setFormatter(formatter)
+    # Callers only enqueue records; a listener thread writes them to the file and console
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
     
     # Create logger
     logger = logging.getLogger(name)
     logger.setLevel(level)
+    logger.addHandler(QueueHandler(log_queue))
+    logger.propagate = False
+    
+    return logger
+
+def setup_transcript_logger(name, log_file):
+    """Set up a file-only logger that appends every transcript to one rotating file"""
+    file_handler = RotatingFileHandler(log_file, maxBytes=10*1024*1024, backupCount=5)
+    file_handler.setFormatter(logging.Formatter('%(asctime)s: %(message)s'))
+    
+    logger = logging.getLogger(name)
+    logger.setLevel(logging.INFO)
     logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    logger.propagate = False
     
     return logger
 
@@ -65,8 +97,162 @@ if config.get_setting('app', 'debug', False):
     main_logger.setLevel(logging.DEBUG)
     trade_logger.setLevel(logging.DEBUG)
     speech_logger.setLevel(logging.DEBUG)
+    console_handler.setLevel(logging.DEBUG)
     main_logger.debug("Debug mode enabled")
 
+class SPSCByteRing:
+    """Fixed-size byte ring buffer for exactly one producer and one consumer thread"""
+    
+    def __init__(self, capacity):
+        self._buf = bytearray(capacity)
+        self._capacity = capacity
+        # Running totals; each is only ever advanced by its own side
+        self._w = 0
+        self._r = 0
+        self._data_ready = threading.Event()
+        self._space_ready = threading.Event()
+        self._closed = False
+    
+    def write(self, data):
+        """Copy data into the ring, blocking while it is full"""
+        view = memoryview(data)
+        while view:
+            free = self._capacity - (self._w - self._r)
+            if not free:
+                # Clear before re-checking so a wakeup from the reader is never lost
+                self._space_ready.clear()
+                if self._capacity - (self._w - self._r) == 0 and not self._closed:
+                    self._space_ready.wait()
+                if self._closed:
+                    return
+                continue
+            
+            n = min(free, len(view))
+            start = self._w % self._capacity
+            first = min(n, self._capacity - start)
+            self._buf[start:start + first] = view[:first]
+            self._buf[:n - first] = view[first:n]
+            self._w += n
+            self._data_ready.set()
+            view = view[n:]
+    
+    def read(self, size):
+        """Read up to size bytes, blocking until they are available or the ring is closed"""
+        size = min(size, self._capacity)
+        while self._w - self._r < size and not self._closed:
+            self._data_ready.clear()
+            if self._w - self._r < size and not self._closed:
+                self._data_ready.wait()
+        
+        n = min(size, self._w - self._r)
+        start = self._r % self._capacity
+        first = min(n, self._capacity - start)
+        # Join straight from views of the ring so the PCM is copied exactly once
+        view = memoryview(self._buf)
+        data = b''.join((view[start:start + first], view[:n - first]))
+        view.release()
+        self._r += n
+        self._space_ready.set()
+        return data
+    
+    def close(self):
+        """Wake both sides; reads drain what is left, then return empty"""
+        self._closed = True
+        self._data_ready.set()
+        self._space_ready.set()
+
+class FFmpegDecoder:
+    """Decode a compressed audio stream to raw PCM with one persistent FFmpeg process"""
+    
+    def __init__(self, codec, sample_rate, channels):
+        self.process = subprocess.Popen([
+            'ffmpeg', '-loglevel', 'error',
+            '-i', 'pipe:0',
+            '-f', 's16le',
+            '-acodec', codec,
+            '-ar', str(sample_rate),
+            '-ac', str(channels),
+            'pipe:1'
+        ], stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        
+        # Larger pipes let the stream thread and FFmpeg run ahead of the recognizer (Linux only)
+        if fcntl is not None and hasattr(fcntl, 'F_SETPIPE_SZ'):
+            for pipe in (self.process.stdin, self.process.stdout):
+                try:
+                    fcntl.fcntl(pipe.fileno(), fcntl.F_SETPIPE_SZ, 1 << 20)
+                except OSError as e:
+                    main_logger.debug(f"Could not enlarge FFmpeg pipe: {e}")
+        
+        # FFmpeg blocks once its stderr pipe fills up, so keep it drained
+        stderr_thread = threading.Thread(target=self._drain_stderr, daemon=True)
+        stderr_thread.start()
+    
+    def _drain_stderr(self):
+        """Read and log FFmpeg stderr until the process exits"""
+        for line in self.process.stderr:
+            main_logger.debug(f"FFmpeg: {line.decode(errors='replace').rstrip()}")
+    
+    def write(self, data):
+        """Feed compressed audio bytes to the decoder"""
+        self.process.stdin.write(data)
+    
+    def read(self, size):
+        """Read up to size bytes of PCM, blocking until they are available"""
+        return self.process.stdout.read(size)
+    
+    def close_input(self):
+        """Signal end of input so FFmpeg flushes the remaining audio"""
+        self.process.stdin.close()
+    
+    def close(self):
+        """Stop the FFmpeg process"""
+        self.process.terminate()
+        self.process.wait()
+
+class PyAVDecoder:
+    """Decode a compressed audio stream to raw PCM in-process with PyAV"""
+    
+    def __init__(self, input_format, sample_rate, channels, buffer_size):
+        self.codec = av.CodecContext.create(input_format, 'r')
+        self.resampler = av.AudioResampler(format='s16',
+                                           layout='mono' if channels == 1 else 'stereo',
+                                           rate=sample_rate)
+        self.ring = SPSCByteRing(buffer_size)
+    
+    def write(self, data):
+        """Parse and decode compressed audio bytes, buffering the resulting PCM"""
+        pcm_parts = []
+        try:
+            packets = self.codec.parse(data)
+        except av.error.FFmpegError as e:
+            main_logger.debug(f"Skipping unparseable audio data: {e}")
+            return
+        
+        for packet in packets:
+            # Skip corrupt or truncated packets and keep decoding, as the FFmpeg process does
+            try:
+                for frame in self.codec.decode(packet):
+                    for resampled in self.resampler.resample(frame):
+                        # Packed s16 frames come back as a (1, samples * channels) int16 array
+                        pcm_parts.append(resampled.to_ndarray())
+            except av.error.FFmpegError as e:
+                main_logger.debug(f"Skipping undecodable audio packet: {e}")
+        
+        if pcm_parts:
+            self.ring.write(np.concatenate(pcm_parts, axis=1).tobytes())
+    
+    def read(self, size):
+        """Read up to size bytes of PCM, blocking until they are available"""
+        return self.ring.read(size)
+    
+    def close_input(self):
+        """Signal end of input so readers drain the remaining audio"""
+        self.ring.close()
+    
+    def close(self):
+        """Release the decoder"""
+        self.close_input()
+
 class RadioStreamTrader:
     def __init__(self, radio_url=None):
         """Initialize the Radio Stream Trader with configuration"""
@@ -85,10 +271,46 @@ class RadioStreamTrader:
             
         main_logger.info(f"Using Radio URL: {self.radio_url}")
         
-        # Initialize queue and tracking variables
-        self.audio_queue = queue.Queue(maxsize=10)
-        self.executed_markets = set()
+        # Stream settings
+        self.buffer_size = radio_config.get('buffer_size', 4096)
+        self.headers = radio_config.get('headers', {})
+        
+        # Settings read on every chunk and trade, resolved once here
+        self.prevent_duplicate_trades = config.get_setting('trading', 'prevent_duplicate_trades', True)
+        self.exact_matching = config.get_setting('speech', 'exact_matching', False)
+        self.save_detections = config.get_setting('speech', 'save_detections', True)
+        self.save_audio_detections = config.get_setting('speech', 'save_audio_detections', True)
+        self.record_all_transcripts = config.get_setting('app', 'record_all_transcripts', False)
+        self.trades_dir = config.get_setting('paths', 'trades', 'trades')
+        self.detections_dir = config.get_setting('paths', 'detections', 'detections')
+        self.audio_detections_dir = os.path.join(self.detections_dir, 'audio')
+        self.transcripts_dir = os.path.join(config.get_setting('paths', 'logs', 'logs'), 'transcripts')
+        self.transcript_logger = None
+        if self.record_all_transcripts:
+            os.makedirs(self.transcripts_dir, exist_ok=True)
+            self.transcript_logger = setup_transcript_logger(
+                'radio_transcripts', os.path.join(self.transcripts_dir, 'radio_transcripts.log'))
+        if self.save_detections and self.save_audio_detections:
+            os.makedirs(self.audio_detections_dir, exist_ok=True)
+        
+        # Trade, detection and transcript files are written off the detection/trading path
+        self.writer = RecordWriter(main_logger)
+        
+        self.decoder = None
+        self.initialize_decoder()
+        
+        # Initialize tracking variables
+        self.claims = MarketClaims(self.prevent_duplicate_trades)
         self.detection_history = []
+        
+        # Rolling window of PCM for the utterance being recognized, trimmed when Vosk commits it
+        chunk_size = config.get_setting('speech', 'chunk_size', 1)
+        self.recent_audio = collections.deque(
+            maxlen=max(1, int(config.get_setting('speech', 'audio_window', 6) / chunk_size)))
+        # Markets already triggered by the current utterance, so partials don't repeat a detection
+        self.utterance_markets = set()
+        self.match_partials = config.get_setting('speech', 'match_partials', True)
+        self.last_partial = ''
         self.running = True
         
         # Load markets from configuration
@@ -96,6 +318,29 @@ class RadioStreamTrader:
         for market_id, market_data in config.get_enabled_markets().items():
             self.markets[market_id] = market_data
             main_logger.info(f"Loaded market: {market_id} - {market_data.get('name')}")
+        
+        self.build_keyword_matcher()
+
+        # Order arguments never change per market, so build them once
+        self.order_templates = {
+            market_id: OrderArgs(
+                price=market_config['price'],
+                size=market_config['size'],
+                side=market_config['side'],
+                token_id=market_config['token_id'],
+            )
+            for market_id, market_config in self.markets.items()
+        }
+        
+        # Reuse warm worker threads for trades instead of spawning one per detection
+        self.trade_pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=config.get_setting('trading', 'max_concurrent_orders', 8),
+            thread_name_prefix="trade")
+        
+        # Orders signed ahead of time, so a detection only has to post one
+        self.signed_orders = SignedOrderPool(self.trading_client, self.order_templates,
+                                             config.get_setting('trading', 'presigned_orders', 2), trade_logger)
+        self.signed_orders.fill(self.trade_pool)
 
     def initialize_trading_client(self):
         """Initialize trading client with retries"""
@@ -131,281 +376,340 @@ class RadioStreamTrader:
                     zip_ref.extractall(".")
                 main_logger.info("Model extraction complete")
             
-            self.model = Model(model_name)
             sample_rate = config.get_setting('speech', 'sample_rate', 16000)
-            self.rec = KaldiRecognizer(self.model, sample_rate)
+            self.use_batch = config.get_setting('speech', 'use_batch', False)
+            if self.use_batch:
+                try:
+                    # Batched GPU decoding, needs a CUDA-enabled libvosk build
+                    GpuInit()
+                    self.model = BatchModel(model_name)
+                    self.rec = BatchRecognizer(self.model, sample_rate)
+                    main_logger.info("Using Vosk GPU batch recognizer")
+                except Exception as e:
+                    main_logger.warning(f"Batch recognizer unavailable, falling back to CPU: {str(e)}")
+                    self.use_batch = False
+            
+            if not self.use_batch:
+                self.model = Model(model_name)
+                self.rec = KaldiRecognizer(self.model, sample_rate)
+                # Only the transcript text is used, skip word timings in results
+                self.rec.SetWords(False)
+                self.rec.SetPartialWords(False)
             main_logger.info("Speech recognition model loaded successfully")
         except Exception as e:
             main_logger.error(f"Failed to initialize speech recognition: {str(e)}")
             main_logger.error(traceback.format_exc())
             raise
 
+    def initialize_decoder(self):
+        """Start the decoder that turns the compressed radio stream into raw PCM"""
+        try:
+            radio_config = config.get_source_config('radio')
+            audio_config = radio_config.get('audio', {})
+            codec = audio_config.get('codec', 'pcm_s16le')
+            decoder = audio_config.get('decoder', 'ffmpeg')
+            self.sample_rate = audio_config.get('sample_rate', 16000)
+            self.channels = audio_config.get('channels', 1)
+            # 16-bit samples, so two bytes per sample per channel
+            self.bytes_per_chunk = int(self.sample_rate * self.channels * 2 * 
+                                       config.get_setting('speech', 'chunk_size', 1))
+
+            if decoder == 'pyav':
+                main_logger.info("Starting in-process PyAV decoder")
+                input_format = audio_config.get('input_format', 'mp3')
+                # Size the PCM ring to absorb a few chunks of network jitter
+                self.decoder = PyAVDecoder(input_format, self.sample_rate, self.channels,
+                                           4 * self.bytes_per_chunk)
+            else:
+                main_logger.info("Starting FFmpeg decoder process")
+                self.decoder = FFmpegDecoder(codec, self.sample_rate, self.channels)
+            main_logger.info("Audio decoder started successfully")
+        except Exception as e:
+            main_logger.error(f"Failed to start audio decoder: {str(e)}")
+            main_logger.error(traceback.format_exc())
+            raise
+
     @backoff.on_exception(backoff.expo, 
                         (Exception),
                         max_tries=5,
                         jitter=backoff.full_jitter)
-    def create_and_submit_order(self, token_id, side, price, size):
+    def create_and_submit_order(self, order_args, signed_order=None):
         """Create and submit order with exponential backoff retry"""
         try:
-            trade_logger.info(f"Creating order: token_id={token_id}, side={side}, price={price}, size={size}")
+            trade_logger.info("Creating order: token_id=%s, side=%s, price=%s, size=%s",
+                              order_args.token_id, order_args.side, order_args.price, order_args.size)
             
-            order_args = OrderArgs(
-                price=price,
-                size=size,
-                side=side,
-                token_id=token_id,
-            )
-            
-            signed_order = self.trading_client.create_order(order_args)
-            trade_logger.info(f"Order created successfully")
+            if signed_order is None:
+                signed_order = self.trading_client.create_order(order_args)
+                trade_logger.info("Order created successfully")
             
             response = self.trading_client.post_order(signed_order)
-            trade_logger.info(f"Order submitted successfully: {response}")
+            trade_logger.info("Order submitted successfully: %s", response)
             
             return response
         except Exception as e:
-            trade_logger.error(f"Order Error: {str(e)}")
-            trade_logger.error(traceback.format_exc())
+            trade_logger.exception("Order Error: %s", e)
             raise
 
     def place_trade(self, market_id, market_config, detected_keyword, detection_time):
         """Place a trade with comprehensive logging"""
         try:
+            started = time.time()
             trade_info = {
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": datetime.fromtimestamp(started).isoformat(),
                 "market_id": market_id,
                 "market_name": market_config.get('name', market_id),
                 "detected_keyword": detected_keyword,
-                "detection_latency": time.time() - detection_time,
+                "detection_latency": started - detection_time,
                 "status": "pending"
             }
             
-            trade_logger.info(f"Executing trade for {market_id} triggered by '{detected_keyword}'")
+            trade_logger.info("Executing trade for %s triggered by '%s'", market_id, detected_keyword)
             
-            # Check if we've already executed this market
-            if config.get_setting('trading', 'prevent_duplicate_trades', True) and market_id in self.executed_markets:
-                trade_logger.warning(f"Skipping trade for {market_id} - already executed")
-                trade_info["status"] = "skipped"
-                trade_info["reason"] = "already_executed"
-                return
+            # Post a pre-signed order if one is ready, otherwise sign now
+            signed_order = self.signed_orders.take(market_id)
             
-            resp = self.create_and_submit_order(
-                token_id=market_config['token_id'],
-                side=market_config['side'],
-                price=market_config['price'],
-                size=market_config['size']
-            )
+            # Copy the template so the client can't alter it between trades
+            resp = self.create_and_submit_order(copy.copy(self.order_templates[market_id]), signed_order)
             
             if resp:
-                self.executed_markets.add(market_id)
                 latency = time.time() - detection_time
                 
                 trade_info["status"] = "success"
                 trade_info["order_response"] = resp
                 trade_info["execution_latency"] = latency
                 
-                trade_logger.info(f"Trade executed - {market_id} - Latency: {latency:.3f}s")
-                trade_logger.info(f"Response: {resp}")
+                trade_logger.info("Trade executed - %s - Latency: %.3fs", market_id, latency)
+                trade_logger.info("Response: %s", resp)
                 
                 # Save trade to file
-                trades_dir = config.get_setting('paths', 'trades', 'trades')
-                with open(f"{trades_dir}/{market_id}_{int(time.time())}.json", 'w') as f:
-                    json.dump(trade_info, f, indent=2)
+                self.writer.append_record(f"{self.trades_dir}/{market_id}.ndjson", trade_info)
             else:
+                self.claims.release(market_id)
                 trade_info["status"] = "failed"
-                trade_logger.error(f"Trade failed - {market_id}: No response from server")
+                trade_logger.error("Trade failed - %s: No response from server", market_id)
                 
                 # Save trade error to file
-                trades_dir = config.get_setting('paths', 'trades', 'trades')
-                with open(f"{trades_dir}/{market_id}_failed_{int(time.time())}.json", 'w') as f:
-                    json.dump(trade_info, f, indent=2)
+                self.writer.append_record(f"{self.trades_dir}/{market_id}.ndjson", trade_info)
         except Exception as e:
+            self.claims.release(market_id)
             trade_info["status"] = "error"
             trade_info["error"] = str(e)
-            trade_logger.error(f"Trade failed - {market_id}: {str(e)}")
-            trade_logger.error(traceback.format_exc())
+            # exception() only walks the traceback if the record is emitted
+            trade_logger.exception("Trade failed - %s: %s", market_id, e)
             
             # Save trade error to file
-            trades_dir = config.get_setting('paths', 'trades', 'trades')
-            with open(f"{trades_dir}/{market_id}_error_{int(time.time())}.json", 'w') as f:
-                json.dump(trade_info, f, indent=2)
+            self.writer.append_record(f"{self.trades_dir}/{market_id}.ndjson", trade_info)
+        
+        # Sign the next order off the critical path if this market can trade again
+        if self.claims.can_trade_again(market_id):
+            self.signed_orders.refill(market_id)
+
+    def can_skip_recognition(self):
+        """Whether decoding is wasted work: every market has traded and transcripts aren't recorded"""
+        return self.transcript_logger is None and self.claims.all_claimed(len(self.markets))
 
     def stream_audio(self):
-        """Stream audio from the radio URL"""
+        """Stream audio from the radio URL into the audio decoder"""
         try:
             main_logger.info(f"Starting to stream audio from {self.radio_url}")
-            radio_config = config.get_source_config('radio')
-            
-            # Get stream configuration
-            buffer_size = radio_config.get('buffer_size', 4096)
-            bytes_per_chunk = int(128 * 1024 / 8 * config.get_setting('speech', 'chunk_size', 1))
             
-            # Get request headers
-            headers = radio_config.get('headers', {})
-            
-            response = requests.get(self.radio_url, stream=True, headers=headers)
+            response = requests.get(self.radio_url, stream=True, headers=self.headers)
             if not response.ok:
                 main_logger.error(f"Failed to connect to radio stream: {response.status_code}")
                 return
                 
             main_logger.info("Connected to radio stream")
             
-            import io
-            chunk_buffer = io.BytesIO()
-            bytes_collected = 0
-
-            for chunk in response.iter_content(chunk_size=buffer_size):
-                if not self.running:
+            # Read the socket directly; the decoder handles the compressed bytes as-is
+            response.raw.decode_content = False
+            while self.running:
+                chunk = response.raw.read(self.buffer_size, decode_content=False)
+                if not chunk:
+                    main_logger.warning("Radio stream ended")
                     break
-                if chunk:
-                    chunk_buffer.write(chunk)
-                    bytes_collected += len(chunk)
-                    
-                    if bytes_collected >= bytes_per_chunk:
-                        audio_data = chunk_buffer.getvalue()
-                        self.audio_queue.put(audio_data)
-                        chunk_buffer = io.BytesIO()
-                        bytes_collected = 0
+                self.decoder.write(chunk)
+        except BrokenPipeError:
+            main_logger.error("Audio decoder closed its input")
         except Exception as e:
             main_logger.error(f"Error streaming audio: {str(e)}")
             main_logger.error(traceback.format_exc())
+        finally:
+            # Closing the input lets the decoder flush the remaining audio
+            try:
+                self.decoder.close_input()
+            except Exception:
+                pass
+
+    def build_keyword_matcher(self):
+        """Index market keywords so each transcript is scanned in a single pass"""
+        # keyword -> market ids, split by trigger type
+        self.exact_keywords = {}
+        any_keywords = {}
+        for market_id, market_config in self.markets.items():
+            trigger_type = 'exact' if self.exact_matching else market_config.get('trigger_type', 'any')
+            if trigger_type == 'exact':
+                index = self.exact_keywords
+            elif trigger_type == 'any':
+                index = any_keywords
+            else:
+                main_logger.warning(f"Unknown trigger type '{trigger_type}' for {market_id}")
+                continue
+            for kw in market_config.get('keywords', []):
+                index.setdefault(kw, []).append(market_id)
+        
+        # Aho-Corasick automaton over all substring keywords
+        self.keyword_automaton = None
+        if any_keywords:
+            self.keyword_automaton = ahocorasick.Automaton()
+            for kw, market_ids in any_keywords.items():
+                self.keyword_automaton.add_word(kw, (kw, market_ids))
+            self.keyword_automaton.make_automaton()
+
+    def match_keywords(self, text):
+        """Return {market_id: keyword} for every market whose keywords match text"""
+        matches = {}
+        for market_id in self.exact_keywords.get(text, ()):
+            matches[market_id] = text
+        
+        if self.keyword_automaton is not None:
+            for _, (kw, market_ids) in self.keyword_automaton.iter(text):
+                for market_id in market_ids:
+                    matches.setdefault(market_id, kw)
+        return matches
+
+    def recognize(self, pcm):
+        """Feed PCM to the recognizer and return the transcripts it has finished"""
+        # Vosk calls libvosk through cffi, which releases the GIL for the whole
+        # call, so the streaming thread keeps reading while this decodes
+        if self.use_batch:
+            # The batch recognizer decodes asynchronously; drain whatever is ready
+            self.rec.AcceptWaveform(pcm)
+            texts = []
+            result = self.rec.Result()
+            while result:
+                texts.append(orjson.loads(result).get('text', ''))
+                result = self.rec.Result()
+            return texts
+        
+        if self.rec.AcceptWaveform(pcm):
+            return [orjson.loads(self.rec.Result()).get('text', '')]
+        return []
 
     def process_audio(self):
-        """Process audio with better error handling and logging"""
+        """Process decoded PCM audio with better error handling and logging"""
         while self.running:
             try:
-                audio_data = self.audio_queue.get(timeout=5)
-                if not audio_data:
-                    speech_logger.warning("Received empty audio data")
-                    continue
+                pcm = self.decoder.read(self.bytes_per_chunk)
+                if not pcm:
+                    speech_logger.warning("Audio decoder ended or returned no data")
+                    break
                 
-                # Process radio MP3 stream using FFmpeg
-                temp_file = f"temp_{threading.get_ident()}.mp3"
-                with open(temp_file, "wb") as f:
-                    f.write(audio_data)
+                # Stream timestamp of this chunk, used as the start of the detection latency
+                chunk_time = time.time()
                 
-                # Configure FFmpeg options from config
-                radio_config = config.get_source_config('radio')
-                audio_config = radio_config.get('audio', {})
-                codec = audio_config.get('codec', 'pcm_s16le')
-                sample_rate = audio_config.get('sample_rate', 16000)
-                channels = audio_config.get('channels', 1)
+                # Only hand whole samples to Vosk; a short final read may end mid-sample
+                pcm = pcm[:len(pcm) - len(pcm) % (2 * self.channels)]
+                self.recent_audio.append(pcm)
                 
-                # Convert using FFmpeg
-                try:
-                    subprocess.run([
-                        'ffmpeg', '-i', temp_file,
-                        '-acodec', codec,
-                        '-ar', str(sample_rate),
-                        '-ac', str(channels),
-                        '-y',
-                        f"{temp_file}_converted.wav"
-                    ], capture_output=True)
+                # Nothing left to trade; keep draining the stream without decoding it
+                if self.can_skip_recognition():
+                    continue
+                
+                texts = self.recognize(pcm)
+                for text in texts:
+                    text = text.lower()
                     
-                    # Read converted audio
-                    with open(f"{temp_file}_converted.wav", "rb") as wf:
-                        data = wf.read()
-                        if self.rec.AcceptWaveform(data):
-                            result = json.loads(self.rec.Result())
-                            text = result.get('text', '').lower()
-                            
-                            if text:
-                                timestamp = datetime.now().strftime('%H:%M:%S')
-                                speech_logger.info(f"[{timestamp}] \"{text}\"")
-                                
-                                # Record all transcripts if configured
-                                if config.get_setting('app', 'record_all_transcripts', False):
-                                    transcript_dir = os.path.join(config.get_setting('paths', 'logs', 'logs'), 'transcripts')
-                                    os.makedirs(transcript_dir, exist_ok=True)
-                                    with open(f"{transcript_dir}/transcript_{int(time.time())}.txt", 'w') as f:
-                                        f.write(f"{timestamp}: {text}")
-                                
-                                for market_id, market_config in self.markets.items():
-                                    if market_id in self.executed_markets and config.get_setting('trading', 'prevent_duplicate_trades', True):
-                                        continue
-                                        
-                                    detected = False
-                                    detected_keyword = None
-                                    
-                                    # Get keywords and trigger type from configuration
-                                    keywords = market_config.get('keywords', [])
-                                    trigger_type = market_config.get('trigger_type', 'any')
-                                    
-                                    # Override trigger type if configured globally
-                                    if config.get_setting('speech', 'exact_matching', False):
-                                        trigger_type = 'exact'
-                                    
-                                    if trigger_type == 'exact':
-                                        # Check if any keyword exactly matches the text
-                                        if text in keywords:
-                                            detected = True
-                                            detected_keyword = text
-                                    elif trigger_type == 'any':
-                                        # Check if any keyword is contained in the text
-                                        for kw in keywords:
-                                            if kw in text:
-                                                detected = True
-                                                detected_keyword = kw
-                                                break
-                                    
-                                    if detected:
-                                        detection_info = {
-                                            "timestamp": datetime.now().isoformat(),
-                                            "market_id": market_id,
-                                            "market_name": market_config.get('name', market_id),
-                                            "detected_keyword": detected_keyword,
-                                            "full_text": text
-                                        }
-                                        
-                                        # Save detection to history and file
-                                        self.detection_history.append(detection_info)
-                                        
-                                        # Save detection to file if configured
-                                        if config.get_setting('speech', 'save_detections', True):
-                                            detections_dir = config.get_setting('paths', 'detections', 'detections')
-                                            with open(f"{detections_dir}/{market_id}_{int(time.time())}.json", 'w') as f:
-                                                json.dump(detection_info, f, indent=2)
-                                                
-                                            # Also save detected audio for verification
-                                            if config.get_setting('speech', 'save_audio_detections', True):
-                                                import shutil
-                                                audio_dir = os.path.join(detections_dir, 'audio')
-                                                os.makedirs(audio_dir, exist_ok=True)
-                                                shutil.copy(f"{temp_file}_converted.wav", 
-                                                          f"{audio_dir}/detection_{market_id}_{int(time.time())}.wav")
-                                        
-                                        speech_logger.info(f"Keyword detected for {market_id}: '{detected_keyword}'")
-                                        threading.Thread(
-                                            target=self.place_trade,
-                                            args=(market_id, market_config, detected_keyword, time.time())
-                                        ).start()
-                                        
-                except Exception as e:
-                    speech_logger.error(f"Error converting audio: {str(e)}")
-                    speech_logger.error(traceback.format_exc())
+                    if text:
+                        now = time.time()
+                        
+                        # Only format the wall-clock time if something will use it
+                        if speech_logger.isEnabledFor(logging.INFO):
+                            timestamp = datetime.fromtimestamp(now).strftime('%H:%M:%S')
+                            speech_logger.info('[%s] "%s"', timestamp, text)
+                        
+                        # Record all transcripts if configured
+                        if self.transcript_logger:
+                            self.transcript_logger.info(text)
+                        
+                        self.detect_keywords(text, chunk_time, now)
+                    
+                    # The utterance is committed; keep only the newest chunk as context for the next one
+                    self.utterance_markets.clear()
+                    self.last_partial = ''
+                    while len(self.recent_audio) > 1:
+                        self.recent_audio.popleft()
                 
-                # Cleanup temporary files
-                try:
-                    if os.path.exists(temp_file):
-                        os.remove(temp_file)
-                    if os.path.exists(f"{temp_file}_converted.wav"):
-                        os.remove(f"{temp_file}_converted.wav")
-                except Exception as e:
-                    speech_logger.error(f"Error cleaning up temp files: {str(e)}")
+                # Nothing committed yet, optionally scan the in-progress hypothesis
+                if not texts and self.match_partials and not self.use_batch:
+                    partial = orjson.loads(self.rec.PartialResult()).get('partial', '').lower()
+                    # The hypothesis often doesn't change between chunks; only rescan new text
+                    if partial and partial != self.last_partial:
+                        self.last_partial = partial
+                        self.detect_keywords(partial, chunk_time, time.time())
                     
-            except queue.Empty:
-                speech_logger.debug("Audio queue timeout - continuing")
-                continue
             except Exception as e:
-                speech_logger.error(f"Error processing audio: {str(e)}")
-                speech_logger.error(traceback.format_exc())
+                speech_logger.exception("Error processing audio: %s", e)
                 time.sleep(1)  # Pause briefly before retrying
 
+    def detect_keywords(self, text, chunk_time, now):
+        """Record detections for text and start a trade for each newly matched market"""
+        matches = self.match_keywords(text)
+        if not matches:
+            return
+        
+        # One timestamp per transcript, so its detection files share an id
+        detected_at = datetime.fromtimestamp(now).isoformat()
+        detection_id = int(now)
+        for market_id, detected_keyword in matches.items():
+            if market_id in self.utterance_markets:
+                continue
+            # Claim before dispatching so duplicates never start a trade thread
+            if not self.claims.claim(market_id):
+                continue
+            self.utterance_markets.add(market_id)
+            
+            market_config = self.markets[market_id]
+            detection_info = {
+                "timestamp": detected_at,
+                "market_id": market_id,
+                "market_name": market_config.get('name', market_id),
+                "detected_keyword": detected_keyword,
+                "full_text": text
+            }
+            
+            # Save detection to history and file
+            self.detection_history.append(detection_info)
+            
+            # Save detection to file if configured
+            if self.save_detections:
+                self.writer.append_record(f"{self.detections_dir}/{market_id}.ndjson", detection_info)
+                    
+                # Also save detected audio for verification
+                if self.save_audio_detections:
+                    self.writer.submit(self.save_audio, f"{self.audio_detections_dir}/detection_{market_id}_{detection_id}.wav",
+                                       b''.join(self.recent_audio))
+            
+            speech_logger.info("Keyword detected for %s: '%s'", market_id, detected_keyword)
+            self.trade_pool.submit(self.place_trade, market_id, market_config,
+                                   detected_keyword, chunk_time)
+
+    def save_audio(self, path, pcm):
+        """Write raw PCM audio to a WAV file"""
+        with wave.open(path, 'wb') as wf:
+            wf.setnchannels(self.channels)
+            wf.setsampwidth(2)
+            wf.setframerate(self.sample_rate)
+            wf.writeframes(pcm)
+
     def start(self):
         """Start the monitoring process with better error handling"""
         main_logger.info(f"Starting RadioStreamTrader for URL: {self.radio_url}")
         
         try:
+            # Start file writer thread
+            self.writer.start()
+            
             # Start audio streaming thread
             stream_thread = threading.Thread(target=self.stream_audio, daemon=True)
             stream_thread.start()
@@ -429,17 +733,23 @@ class RadioStreamTrader:
                 
         except KeyboardInterrupt:
             main_logger.info("Received keyboard interrupt, shutting down")
-            self.running = False
+            self.stop()
             main_logger.info("Shutdown complete")
         except Exception as e:
             main_logger.error(f"Error in main loop: {str(e)}")
             main_logger.error(traceback.format_exc())
-            self.running = False
+            self.stop()
 
     def stop(self):
         """Stop all threads and cleanup"""
         self.running = False
         main_logger.info("Stopping RadioStreamTrader")
+        if self.decoder:
+            self.decoder.close()
+        # Stop accepting trades; trades already submitted finish in the background
+        self.trade_pool.shutdown(wait=False)
+        # Flush pending trade and detection files before exiting
+        self.writer.close()
 
 def main():
     """Main entry point with command line argument handling"""
@@ -453,6 +763,7 @@ def main():
         main_logger.setLevel(logging.DEBUG)
         trade_logger.setLevel(logging.DEBUG)
         speech_logger.setLevel(logging.DEBUG)
+        console_handler.setLevel(logging.DEBUG)
         main_logger.debug("Debug mode enabled via command line")
     
     main_logger.info("Starting Radio monitoring application")
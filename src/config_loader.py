@@ -1,10 +1,24 @@
 import os
+import copy
 import yaml
 import logging
-from typing import Dict, Any, Optional, List
+import functools
+from typing import Dict, Any, Optional, Sequence
+
+# Prefer the libyaml-backed loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:
+    from yaml import SafeLoader as YamlLoader
 
 logger = logging.getLogger(__name__)
 
+@functools.lru_cache(maxsize=256)
+def _parse_yaml(filepath: str, mtime_ns: int, size: int) -> Any:
+    """Parse a YAML file, cached by path plus modification time and size"""
+    with open(filepath, 'rb') as file:
+        return yaml.load(file, Loader=YamlLoader)
+
 class ConfigLoader:
     """Configuration loader utility for the application"""
     
@@ -17,6 +31,8 @@ class ConfigLoader:
         self.config_dir = config_dir
         self.settings = {}
         self.markets = {}
+        self.enabled_markets = {}
+        self.enabled_market_list = ()
         self.sources = {}
         
         # Create config directory if it doesn't exist
@@ -30,22 +46,26 @@ class ConfigLoader:
         
         logger.info(f"Configuration loaded: {len(self.markets)} markets, {len(self.sources)} sources")
     
-    def _load_yaml(self, filepath: str) -> Dict:
+    def _load_yaml(self, filepath: str, st: Optional[os.stat_result] = None) -> Dict:
         """Load a YAML file
         
         Args:
             filepath: Path to the YAML file
+            st: Stat result for the file, if the caller already has one
             
         Returns:
             Dictionary containing the YAML contents
         """
         try:
-            if not os.path.exists(filepath):
-                logger.warning(f"Configuration file not found: {filepath}")
-                return {}
-                
-            with open(filepath, 'r') as file:
-                return yaml.safe_load(file)
+            if st is None:
+                try:
+                    st = os.stat(filepath)
+                except FileNotFoundError:
+                    logger.warning(f"Configuration file not found: {filepath}")
+                    return {}
+            
+            # Unchanged files come from the cache; copy so callers can't alter the cached tree
+            return copy.deepcopy(_parse_yaml(os.path.abspath(filepath), st.st_mtime_ns, st.st_size))
         except Exception as e:
             logger.error(f"Error loading configuration from {filepath}: {str(e)}")
             return {}
@@ -59,16 +79,24 @@ class ConfigLoader:
         """Load market configurations"""
         markets_path = os.path.join(self.config_dir, 'markets.yaml')
         self.markets = self._load_yaml(markets_path)
+        
+        # Filter once here instead of on every lookup
+        self.enabled_markets = {k: v for k, v in self.markets.items() if not v.get('disabled', False)}
+        self.enabled_market_list = tuple(self.enabled_markets.values())
     
     def _load_sources(self) -> None:
         """Load source configurations"""
         sources_dir = os.path.join(self.config_dir, 'sources')
         
-        for filename in os.listdir(sources_dir):
-            if filename.endswith('.yaml'):
-                source_name = filename.replace('.yaml', '')
-                filepath = os.path.join(sources_dir, filename)
-                self.sources[source_name] = self._load_yaml(filepath)
+        # One directory scan; each entry already carries its path and file type
+        with os.scandir(sources_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith('.yaml') and entry.is_file():
+                    self.sources[entry.name[:-5]] = self._load_yaml(entry.path, entry.stat())
+    
+    def invalidate(self) -> None:
+        """Drop cached YAML so the next load re-parses every file"""
+        _parse_yaml.cache_clear()
     
     def get_setting(self, section: str, key: str, default: Any = None) -> Any:
         """Get a setting value
@@ -110,7 +138,7 @@ class ConfigLoader:
         Returns:
             Dictionary of enabled market configurations
         """
-        return {k: v for k, v in self.markets.items() if not v.get('disabled', False)}
+        return self.enabled_markets
     
     def get_source_config(self, source_name: str) -> Optional[Dict]:
         """Get source configuration
@@ -123,7 +151,7 @@ class ConfigLoader:
         """
         return self.sources.get(source_name)
     
-    def get_markets_for_source(self, source_name: str, channel_name: Optional[str] = None) -> List[Dict]:
+    def get_markets_for_source(self, source_name: str, channel_name: Optional[str] = None) -> Sequence[Dict]:
         """Get markets configured for a specific source
         
         Args:
@@ -131,7 +159,7 @@ class ConfigLoader:
             channel_name: Optional channel name for filtering
             
         Returns:
-            List of market configurations for the source
+            Sequence of market configurations for the source
         """
         source_config = self.get_source_config(source_name)
         if not source_config:
@@ -146,10 +174,10 @@ class ConfigLoader:
                             if self.get_market(market_id)]
         
         # Otherwise return all enabled markets
-        return list(self.get_enabled_markets().values())
+        return self.enabled_market_list
 
-# Singleton instance
-config = ConfigLoader()
+# Singleton instance, created on first use
+config = None
 
 def get_config() -> ConfigLoader:
     """Get the configuration loader instance
@@ -157,4 +185,7 @@ def get_config() -> ConfigLoader:
     Returns:
         ConfigLoader instance
     """
+    global config
+    if config is None:
+        config = ConfigLoader()
     return config
\ No newline at end of file
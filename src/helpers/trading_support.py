@@ -0,0 +1,138 @@
+import collections
+import copy
+import queue
+import threading
+
+import orjson
+
+
+class MarketClaims:
+    """Markets that have traded, so with duplicate prevention each one only triggers once"""
+
+    def __init__(self, prevent_duplicates):
+        self.prevent_duplicates = prevent_duplicates
+        self.executed = set()
+        self.lock = threading.Lock()
+
+    def claim(self, market_id):
+        """Atomically reserve a market for trading; False if it was already traded"""
+        with self.lock:
+            if self.prevent_duplicates and market_id in self.executed:
+                return False
+            self.executed.add(market_id)
+            return True
+
+    def release(self, market_id):
+        """Allow a market to trigger again after its trade did not go through"""
+        with self.lock:
+            self.executed.discard(market_id)
+
+    def can_trade_again(self, market_id):
+        """Whether a later detection could still trade this market"""
+        return not self.prevent_duplicates or market_id not in self.executed
+
+    def all_claimed(self, market_count):
+        """Whether every market has traded and none may trade again"""
+        return self.prevent_duplicates and len(self.executed) >= market_count
+
+
+class SignedOrderPool:
+    """Orders signed ahead of time per market, so a detection only has to post one"""
+
+    def __init__(self, trading_client, order_templates, depth, logger):
+        self.trading_client = trading_client
+        self.order_templates = order_templates
+        self.depth = depth
+        self.logger = logger
+        self.orders = {market_id: collections.deque() for market_id in order_templates}
+        # Markets with a refill running, so overlapping refills never sign more than depth orders
+        self.refilling = set()
+        self.lock = threading.Lock()
+
+    def take(self, market_id):
+        """A pre-signed order for the market, or None if none is ready"""
+        try:
+            return self.orders[market_id].popleft()
+        except IndexError:
+            return None
+
+    def fill(self, executor):
+        """Sign every market's orders in the background"""
+        if self.depth:
+            for market_id in self.orders:
+                executor.submit(self.refill, market_id)
+
+    def refill(self, market_id):
+        """Sign orders for a market until its pool is full; returns at once if another refill is running"""
+        if not self.depth:
+            return
+        with self.lock:
+            if market_id in self.refilling:
+                return
+            self.refilling.add(market_id)
+        try:
+            orders = self.orders[market_id]
+            while len(orders) < self.depth:
+                orders.append(self.trading_client.create_order(copy.copy(self.order_templates[market_id])))
+        except Exception as e:
+            self.logger.warning("Could not pre-sign order for %s: %s", market_id, e)
+        finally:
+            with self.lock:
+                self.refilling.discard(market_id)
+
+
+class RecordWriter:
+    """Background thread that runs file writes off the detection and trading path"""
+
+    def __init__(self, logger):
+        self.logger = logger
+        self.queue = queue.SimpleQueue()
+        self.thread = None
+        # One append-only NDJSON file per path, owned by the writer thread
+        self.files = {}
+
+    def start(self):
+        """Start the writer thread"""
+        self.thread = threading.Thread(target=self.drain, daemon=True)
+        self.thread.start()
+
+    def submit(self, func, path, data):
+        """Queue func(path, data) to run on the writer thread"""
+        self.queue.put((func, path, data))
+
+    def append_record(self, path, record):
+        """Queue a record to be appended to an NDJSON file"""
+        self.queue.put((self.append_json, path, record))
+
+    def append_json(self, path, record):
+        """Append a record as one JSON line, keeping the file open for the next one"""
+        f = self.files.get(path)
+        if f is None:
+            f = self.files[path] = open(path, 'ab')
+        f.write(orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE))
+
+    def drain(self):
+        """Run queued file writes until the stop sentinel arrives"""
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            func, path, data = item
+            try:
+                func(path, data)
+                # Flush once a burst has been written rather than after every record
+                if self.queue.empty():
+                    for f in self.files.values():
+                        f.flush()
+            except Exception as e:
+                self.logger.exception("Error writing %s: %s", path, e)
+
+        for f in self.files.values():
+            f.close()
+        self.files.clear()
+
+    def close(self):
+        """Write everything still queued, then stop the writer thread"""
+        if self.thread and self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join()
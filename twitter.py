@@ -1,28 +1,37 @@
 import subprocess
+import string
 import time
 from datetime import datetime
-import json
+import orjson
 import threading
 import queue
+import concurrent.futures
+import multiprocessing
+import copy
 import requests
-import m3u8
+from urllib.parse import urljoin, urlparse, parse_qs
 import os
 import traceback
 import argparse
 import sys
 import logging
-from logging.handlers import RotatingFileHandler
+import atexit
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 import backoff
 
-from vosk import Model, KaldiRecognizer
-from py_clob_client.clob_types import OrderArgs
-from clob_client import create_clob_client
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+import ahocorasick
 
 # Add the src directory to the path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
 # Import configuration loader
 from utils.config_loader import get_config
+from helpers.trading_support import MarketClaims, SignedOrderPool, RecordWriter
 
 # Get configuration
 config = get_config()
@@ -31,27 +40,78 @@ config = get_config()
 for path_name, path in config.settings.get('paths', {}).items():
     os.makedirs(path, exist_ok=True)
 
-# Configure logging
+# Transcripts and keywords are compared without punctuation ("mcdonald's" matches "mcdonalds")
+PUNCTUATION_TABLE = str.maketrans('', '', string.punctuation)
+
+# Configure logging; one formatter and one console handler are shared by every logger
+log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+# The console only shows warnings unless debug is enabled; the log files keep everything
+console_handler = logging.StreamHandler()
+console_handler.setFormatter(log_formatter)
+console_handler.setLevel(config.get_setting('app', 'console_log_level', 'WARNING'))
+
 def setup_logger(name, log_file, level=logging.INFO):
     """Function to set up a logger with a specific name and file"""
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    
     # File handler with rotation (10MB max size, keep 5 backups)
-    file_handler = RotatingFileHandler(log_file, maxBytes=10*1024*1024, backupCount=5)
-    file_handler.setFormatter(formatter)
+    file_handler = RotatingFileHandler(log_file, maxBytes=10*1024*1024, backupCount=5, delay=True)
+    file_handler.setFormatter(log_formatter)
     
-    # Console handler
-    console_handler = logging.StreamHandler()
-    console_handler.setFormatter(formatter)
+    # Callers only enqueue records; a listener thread writes them to the file and console
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
     
     # Create logger
     logger = logging.getLogger(name)
     logger.setLevel(level)
+    logger.addHandler(QueueHandler(log_queue))
+    logger.propagate = False
+    
+    return logger
+
+def setup_transcript_logger(name, log_file):
+    """Set up a file-only logger that appends every transcript to one rotating file"""
+    logger = logging.getLogger(name)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    
+    # Worker processes leave the file to the parent, see forward_logs_to
+    if worker_log_queue is not None:
+        logger.addHandler(worker_queue_handler())
+        return logger
+    
+    file_handler = RotatingFileHandler(log_file, maxBytes=10*1024*1024, backupCount=5)
+    file_handler.setFormatter(logging.Formatter('%(asctime)s: %(message)s'))
     logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
     
     return logger
 
+# Set in worker processes, whose records are written by the parent (see forward_logs_to)
+worker_log_queue = None
+
+def worker_queue_handler():
+    """Queue handler that sends a worker's records to the parent, tagged with the worker name"""
+    handler = QueueHandler(worker_log_queue)
+    handler.setFormatter(logging.Formatter('[%(processName)s] %(message)s'))
+    return handler
+
+def forward_logs_to(log_queue):
+    """Send this worker's log records to the parent process, which is the only writer of the log files"""
+    global worker_log_queue
+    worker_log_queue = log_queue
+    for logger in (main_logger, trade_logger, speech_logger):
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+        logger.addHandler(worker_queue_handler())
+
+class ForwardedRecordHandler(logging.Handler):
+    """Hand records forwarded by worker processes to the parent's logger of the same name"""
+    
+    def emit(self, record):
+        logging.getLogger(record.name).handle(record)
+
 # Get log paths from configuration
 logs_dir = config.get_setting('paths', 'logs', 'logs')
 main_logger = setup_logger('twitter_main', os.path.join(logs_dir, 'twitter_main.log'))
@@ -63,6 +123,7 @@ if config.get_setting('app', 'debug', False):
     main_logger.setLevel(logging.DEBUG)
     trade_logger.setLevel(logging.DEBUG)
     speech_logger.setLevel(logging.DEBUG)
+    console_handler.setLevel(logging.DEBUG)
     main_logger.debug("Debug mode enabled")
 
 class TwitterStreamTrader:
@@ -83,9 +144,61 @@ class TwitterStreamTrader:
             
         main_logger.info(f"Using Twitter URL: {self.twitter_url}")
         
-        # Initialize queue and tracking variables
-        self.audio_queue = queue.Queue(maxsize=10)
-        self.executed_markets = set()
+        # yt-dlp and FFmpeg command lines only differ in the URL between reconnects, so build them once
+        ytdlp_options = twitter_config.get('ytdlp_options', {'format': 'audio_only/audio/worst', 'quiet': True})
+        self.ytdlp_cmd = ['yt-dlp', '--get-url']
+        for key, value in ytdlp_options.items():
+            if isinstance(value, bool):
+                if value:
+                    self.ytdlp_cmd.append(f'--{key}')
+            else:
+                self.ytdlp_cmd.append(f'--{key}')
+                self.ytdlp_cmd.append(str(value))
+        self.ytdlp_timeout = twitter_config.get('ytdlp_timeout', 15)
+        
+        audio_config = twitter_config.get('audio', {})
+        self.read_size = audio_config.get('read_size', 8192)
+        self.ffmpeg_input_args = [
+            'ffmpeg', '-loglevel', 'error',
+            # Let FFmpeg retry dropped HTTP connections itself instead of ending the stream
+            '-reconnect', '1',
+            '-reconnect_streamed', '1',
+            '-reconnect_delay_max', '2',
+            *audio_config.get('ffmpeg_input_flags', []),
+        ]
+        self.ffmpeg_output_args = [
+            '-acodec', audio_config.get('codec', 'pcm_s16le'),
+            '-ar', str(audio_config.get('sample_rate', 16000)),
+            '-ac', str(audio_config.get('channels', 1)),
+            '-f', 'wav',
+            '-'
+        ]
+        
+        # Settings read on every transcript and trade, resolved once here
+        self.prevent_duplicate_trades = config.get_setting('trading', 'prevent_duplicate_trades', True)
+        self.exact_matching = config.get_setting('speech', 'exact_matching', False)
+        self.save_detections = config.get_setting('speech', 'save_detections', True)
+        self.record_all_transcripts = config.get_setting('app', 'record_all_transcripts', False)
+        self.auto_restart = config.get_setting('app', 'auto_restart', True)
+        self.trades_dir = config.get_setting('paths', 'trades', 'trades')
+        self.detections_dir = config.get_setting('paths', 'detections', 'detections')
+        self.transcripts_dir = os.path.join(config.get_setting('paths', 'logs', 'logs'), 'transcripts')
+        self.transcript_logger = None
+        if self.record_all_transcripts:
+            os.makedirs(self.transcripts_dir, exist_ok=True)
+            self.transcript_logger = setup_transcript_logger(
+                'twitter_transcripts', os.path.join(self.transcripts_dir, 'twitter_transcripts.log'))
+        
+        # Resolved stream URL and the time it stops being valid, reused across reconnects
+        self.cached_stream_url = None
+        self.cached_stream_expiry = 0
+        
+        # Initialize queue and tracking variables; recognized (text, time) pairs wait here for matching
+        self.text_queue = queue.Queue(maxsize=64)
+        self.claims = MarketClaims(self.prevent_duplicate_trades)
+        
+        # Trade, detection and transcript files are written off the detection/trading path
+        self.writer = RecordWriter(main_logger)
         self.detection_history = []
         
         # Load markets from configuration
@@ -93,11 +206,44 @@ class TwitterStreamTrader:
         for market_id, market_data in config.get_enabled_markets().items():
             self.markets[market_id] = market_data
             main_logger.info(f"Loaded market: {market_id} - {market_data.get('name')}")
+        
+        self.build_keyword_matcher()
+        
+        # Restrict recognition to keyword vocabulary if configured
+        if config.get_setting('speech', 'use_grammar', False):
+            if self.use_batch:
+                main_logger.warning("Keyword grammar is not supported by the batch recognizer, ignoring use_grammar")
+            else:
+                self.apply_keyword_grammar()
+        
+        # Order arguments never change per market, so build them once
+        from py_clob_client.clob_types import OrderArgs
+        self.order_templates = {
+            market_id: OrderArgs(
+                price=market_config['price'],
+                size=market_config['size'],
+                side=market_config['side'],
+                token_id=market_config['token_id'],
+            )
+            for market_id, market_config in self.markets.items()
+        }
+        
+        # Reuse warm worker threads for trades instead of spawning one per detection
+        self.trade_pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=config.get_setting('trading', 'max_concurrent_orders', 8),
+            thread_name_prefix="trade")
+        
+        # Orders signed ahead of time, so a detection only has to post one
+        self.signed_orders = SignedOrderPool(self.trading_client, self.order_templates,
+                                             config.get_setting('trading', 'presigned_orders', 2), trade_logger)
+        self.signed_orders.fill(self.trade_pool)
 
     def initialize_trading_client(self):
         """Initialize trading client with retries"""
         try:
             main_logger.info("Initializing trading client")
+            # Imported here so loading this module doesn't pull in the CLOB client stack
+            from clob_client import create_clob_client
             self.trading_client = create_clob_client()
             main_logger.info("Trading client initialized successfully")
         except Exception as e:
@@ -109,44 +255,87 @@ class TwitterStreamTrader:
         """Initialize speech recognition with error handling"""
         try:
             main_logger.info("Loading Vosk model")
+            # Imported here so loading this module doesn't load libvosk
+            from vosk import Model, KaldiRecognizer, BatchModel, BatchRecognizer, GpuInit
             model_name = config.get_setting('speech', 'model_name', "vosk-model-small-en-us-0.15")
             
             if not os.path.exists(model_name):
                 main_logger.warning(f"Model directory {model_name} not found. Please ensure it's downloaded")
                 main_logger.info(f"You can download it from: https://alphacephei.com/vosk/models/{model_name}.zip")
             
-            self.model = Model(model_name)
-            self.rec = KaldiRecognizer(self.model, config.get_setting('speech', 'sample_rate', 16000))
+            sample_rate = config.get_setting('speech', 'sample_rate', 16000)
+            self.use_batch = config.get_setting('speech', 'use_batch', False)
+            if self.use_batch:
+                try:
+                    # Batched GPU decoding, needs a CUDA-enabled libvosk build
+                    GpuInit()
+                    self.model = BatchModel(model_name)
+                    self.rec = BatchRecognizer(self.model, sample_rate)
+                    main_logger.info("Using Vosk GPU batch recognizer")
+                except Exception as e:
+                    main_logger.warning(f"Batch recognizer unavailable, falling back to CPU: {str(e)}")
+                    self.use_batch = False
+            
+            if not self.use_batch:
+                self.model = Model(model_name)
+                self.rec = KaldiRecognizer(self.model, sample_rate)
+                # Only the transcript text is used, skip word timings in results
+                self.rec.SetWords(False)
+                self.rec.SetPartialWords(False)
             main_logger.info("Speech recognition model loaded successfully")
         except Exception as e:
             main_logger.error(f"Failed to initialize speech recognition: {str(e)}")
             main_logger.error(traceback.format_exc())
             raise
 
+    def apply_keyword_grammar(self):
+        """Limit the recognizer's search space to the words used by market keywords"""
+        words = {word for market_config in self.markets.values()
+                 for kw in market_config.get('keywords', []) for word in kw.lower().split()}
+        # [unk] absorbs all other speech so it is not forced onto a keyword
+        grammar = orjson.dumps(sorted(words) + ['[unk]']).decode()
+        self.rec.SetGrammar(grammar)
+        main_logger.info(f"Recognizer grammar limited to {len(words)} keyword words")
+
     def get_stream_url(self):
+        """Get the audio stream URL, reusing the last one until shortly before it expires"""
+        if self.cached_stream_url and time.time() < self.cached_stream_expiry - 30:
+            main_logger.info("Reusing cached stream URL")
+            return self.cached_stream_url
+        
+        stream_url = self.resolve_stream_url()
+        if stream_url:
+            self.cached_stream_url = stream_url
+            self.cached_stream_expiry = self.stream_url_expiry(stream_url)
+        return stream_url
+
+    def invalidate_stream_url(self):
+        """Forget the cached stream URL so the next lookup runs yt-dlp again"""
+        self.cached_stream_url = None
+        self.cached_stream_expiry = 0
+
+    def stream_url_expiry(self, stream_url):
+        """Read the expiry timestamp signed into a stream URL, defaulting to five minutes"""
+        query = parse_qs(urlparse(stream_url).query)
+        for key in ('Expires', 'expires', 'expire', 'exp'):
+            try:
+                return float(query[key][0])
+            except (KeyError, ValueError):
+                continue
+        return time.time() + 300
+
+    def resolve_stream_url(self):
         """Get the audio stream URL from a Twitter space or broadcast"""
         try:
             main_logger.info(f"Getting stream URL for Twitter URL: {self.twitter_url}")
             
-            # Get yt-dlp options from configuration
-            twitter_config = config.get_source_config('twitter')
-            ytdlp_options = twitter_config.get('ytdlp_options', {'format': 'audio_only/audio/worst', 'quiet': True})
-            
-            ytdlp_cmd = ['yt-dlp', '--get-url']
-            for key, value in ytdlp_options.items():
-                if isinstance(value, bool):
-                    if value:
-                        ytdlp_cmd.append(f'--{key}')
-                else:
-                    ytdlp_cmd.append(f'--{key}')
-                    ytdlp_cmd.append(str(value))
-            
-            ytdlp_cmd.append(self.twitter_url)
+            ytdlp_cmd = self.ytdlp_cmd + [self.twitter_url]
             
             main_logger.debug(f"Running yt-dlp command: {' '.join(ytdlp_cmd)}")
             
-            # Execute yt-dlp command and get output
-            stream_url = subprocess.check_output(ytdlp_cmd, stderr=subprocess.PIPE).decode().strip()
+            # Execute yt-dlp command and get output; a hung yt-dlp must not stall reconnects
+            result = subprocess.run(ytdlp_cmd, capture_output=True, timeout=self.ytdlp_timeout, check=True)
+            stream_url = result.stdout.decode(errors='replace').strip()
             
             if not stream_url:
                 main_logger.error("No stream URL found")
@@ -157,23 +346,30 @@ class TwitterStreamTrader:
             # If the URL is an m3u8 playlist, parse it to get the audio stream
             if stream_url.endswith('.m3u8'):
                 main_logger.info("Parsing m3u8 playlist...")
-                playlist = m3u8.load(stream_url)
+                response = requests.get(stream_url, timeout=10)
+                response.raise_for_status()
+                
+                # Every non-comment line of a master playlist is a variant stream URI
+                uris = [line for line in response.text.splitlines() if line and not line.startswith('#')]
                 
                 # Try to get audio-only stream
-                for stream in playlist.playlists:
-                    if 'audio_only' in stream.uri.lower():
+                for uri in uris:
+                    if 'audio_only' in uri.lower():
                         main_logger.info("Found audio-only stream")
-                        return stream.uri
+                        return urljoin(stream_url, uri)
                 
                 # Fallback to first available stream
-                if playlist.playlists:
+                if uris:
                     main_logger.info("Using first available stream from playlist")
-                    return playlist.playlists[0].uri
+                    return urljoin(stream_url, uris[0])
             
             return stream_url
                 
+        except subprocess.TimeoutExpired:
+            main_logger.error(f"yt-dlp timed out after {self.ytdlp_timeout}s")
+            return None
         except subprocess.CalledProcessError as e:
-            main_logger.error(f"Error running yt-dlp: {e.stderr.decode()}")
+            main_logger.error(f"Error running yt-dlp: {e.stderr.decode(errors='replace')}")
             return None
         except Exception as e:
             main_logger.error(f"Error getting stream URL: {e}")
@@ -189,22 +385,16 @@ class TwitterStreamTrader:
 
             main_logger.info(f"Starting FFmpeg with stream URL...")
             
-            # Get audio processing options from configuration
-            twitter_config = config.get_source_config('twitter')
-            audio_config = twitter_config.get('audio', {})
-            codec = audio_config.get('codec', 'pcm_s16le')
-            sample_rate = audio_config.get('sample_rate', 16000)
-            channels = audio_config.get('channels', 1)
+            process = subprocess.Popen(
+                self.ffmpeg_input_args + ['-i', stream_url] + self.ffmpeg_output_args,
+                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
             
-            process = subprocess.Popen([
-                'ffmpeg', 
-                '-i', stream_url,
-                '-acodec', codec, 
-                '-ar', str(sample_rate), 
-                '-ac', str(channels), 
-                '-f', 'wav',
-                '-'
-            ], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+            # A larger pipe lets FFmpeg keep decoding while the reader is busy (Linux only)
+            if fcntl is not None and hasattr(fcntl, 'F_SETPIPE_SZ'):
+                try:
+                    fcntl.fcntl(process.stdout.fileno(), fcntl.F_SETPIPE_SZ, 1 << 20)
+                except OSError as e:
+                    main_logger.debug(f"Could not enlarge FFmpeg pipe: {e}")
             
             main_logger.info("FFmpeg process started successfully")
             return process
@@ -213,178 +403,210 @@ class TwitterStreamTrader:
             main_logger.error(traceback.format_exc())
             raise
 
+    def stop_stream(self, process):
+        """Stop FFmpeg once its output has ended; True if it had exited with an error by itself"""
+        # stdout reaches EOF a moment before FFmpeg is reaped, so poll() would usually still
+        # report it as running. Give it a few seconds to exit and read its own exit status
+        try:
+            failed = process.wait(timeout=5) != 0
+        except subprocess.TimeoutExpired:
+            # Still running, so it did not fail by itself; the SIGTERM below says nothing about the URL
+            failed = False
+        process.terminate()
+        process.wait()
+        return failed
+
     @backoff.on_exception(backoff.expo, 
                          (Exception),
                          max_tries=5,
                          jitter=backoff.full_jitter)
-    def create_and_submit_order(self, token_id, side, price, size):
+    def create_and_submit_order(self, order_args, signed_order=None):
         """Create and submit order with exponential backoff retry"""
         try:
-            trade_logger.info(f"Creating order: token_id={token_id}, side={side}, price={price}, size={size}")
-            
-            order_args = OrderArgs(
-                price=price,
-                size=size,
-                side=side,
-                token_id=token_id,
-            )
+            trade_logger.info("Creating order: token_id=%s, side=%s, price=%s, size=%s",
+                              order_args.token_id, order_args.side, order_args.price, order_args.size)
             
-            signed_order = self.trading_client.create_order(order_args)
-            trade_logger.info(f"Order created successfully")
+            if signed_order is None:
+                signed_order = self.trading_client.create_order(order_args)
+                trade_logger.info("Order created successfully")
             
             response = self.trading_client.post_order(signed_order)
-            trade_logger.info(f"Order submitted successfully: {response}")
+            trade_logger.info("Order submitted successfully: %s", response)
             
             return response
         except Exception as e:
-            trade_logger.error(f"Order Error: {str(e)}")
-            trade_logger.error(traceback.format_exc())
+            trade_logger.exception("Order Error: %s", e)
             raise
 
     def place_trade(self, market_id, market_config, detected_keyword, detection_time):
         """Place a trade with comprehensive logging"""
         try:
+            started = time.time()
             trade_info = {
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": datetime.fromtimestamp(started).isoformat(),
                 "market_id": market_id,
                 "market_name": market_config.get('name', market_id),
                 "detected_keyword": detected_keyword,
-                "detection_latency": time.time() - detection_time,
+                "detection_latency": started - detection_time,
                 "status": "pending"
             }
             
-            trade_logger.info(f"Executing trade for {market_id} triggered by '{detected_keyword}'")
+            trade_logger.info("Executing trade for %s triggered by '%s'", market_id, detected_keyword)
             
-            # Check if we've already executed this market
-            if config.get_setting('trading', 'prevent_duplicate_trades', True) and market_id in self.executed_markets:
-                trade_logger.warning(f"Skipping trade for {market_id} - already executed")
-                trade_info["status"] = "skipped"
-                trade_info["reason"] = "already_executed"
-                return
+            # Post a pre-signed order if one is ready, otherwise sign now
+            signed_order = self.signed_orders.take(market_id)
             
-            resp = self.create_and_submit_order(
-                token_id=market_config['token_id'],
-                side=market_config['side'],
-                price=market_config['price'],
-                size=market_config['size']
-            )
+            # Copy the template so the client can't alter it between trades
+            resp = self.create_and_submit_order(copy.copy(self.order_templates[market_id]), signed_order)
             
             if resp:
-                self.executed_markets.add(market_id)
                 latency = time.time() - detection_time
                 
                 trade_info["status"] = "success"
                 trade_info["order_response"] = resp
                 trade_info["execution_latency"] = latency
                 
-                trade_logger.info(f"Trade executed - {market_id} - Latency: {latency:.3f}s")
-                trade_logger.info(f"Response: {resp}")
+                trade_logger.info("Trade executed - %s - Latency: %.3fs", market_id, latency)
+                trade_logger.info("Response: %s", resp)
                 
                 # Save trade to file
-                trades_dir = config.get_setting('paths', 'trades', 'trades')
-                with open(f"{trades_dir}/{market_id}_{int(time.time())}.json", 'w') as f:
-                    json.dump(trade_info, f, indent=2)
+                self.writer.append_record(f"{self.trades_dir}/{market_id}.ndjson", trade_info)
             else:
+                self.claims.release(market_id)
                 trade_info["status"] = "failed"
-                trade_logger.error(f"Trade failed - {market_id}: No response from server")
+                trade_logger.error("Trade failed - %s: No response from server", market_id)
                 
                 # Save trade error to file
-                trades_dir = config.get_setting('paths', 'trades', 'trades')
-                with open(f"{trades_dir}/{market_id}_failed_{int(time.time())}.json", 'w') as f:
-                    json.dump(trade_info, f, indent=2)
+                self.writer.append_record(f"{self.trades_dir}/{market_id}.ndjson", trade_info)
         except Exception as e:
+            self.claims.release(market_id)
             trade_info["status"] = "error"
             trade_info["error"] = str(e)
-            trade_logger.error(f"Trade failed - {market_id}: {str(e)}")
-            trade_logger.error(traceback.format_exc())
+            # exception() only walks the traceback if the record is emitted
+            trade_logger.exception("Trade failed - %s: %s", market_id, e)
             
             # Save trade error to file
-            trades_dir = config.get_setting('paths', 'trades', 'trades')
-            with open(f"{trades_dir}/{market_id}_error_{int(time.time())}.json", 'w') as f:
-                json.dump(trade_info, f, indent=2)
+            self.writer.append_record(f"{self.trades_dir}/{market_id}.ndjson", trade_info)
+        
+        # Sign the next order off the critical path if this market can trade again
+        if self.claims.can_trade_again(market_id):
+            self.signed_orders.refill(market_id)
+
+    def can_skip_recognition(self):
+        """Whether decoding is wasted work: every market has traded and transcripts aren't recorded"""
+        return self.transcript_logger is None and self.claims.all_claimed(len(self.markets))
+
+    def build_keyword_matcher(self):
+        """Index market keywords so each transcript is scanned in a single pass"""
+        # keyword -> market ids, split by trigger type
+        self.exact_keywords = {}
+        any_keywords = {}
+        for market_id, market_config in self.markets.items():
+            trigger_type = 'exact' if self.exact_matching else market_config.get('trigger_type', 'any')
+            if trigger_type == 'exact':
+                index = self.exact_keywords
+            elif trigger_type == 'any':
+                index = any_keywords
+            else:
+                main_logger.warning(f"Unknown trigger type '{trigger_type}' for {market_id}")
+                continue
+            # Normalize keywords the same way as transcripts
+            for kw in market_config.get('keywords', []):
+                index.setdefault(kw.lower().translate(PUNCTUATION_TABLE), []).append(market_id)
+        
+        # Aho-Corasick automaton over all substring keywords
+        self.keyword_automaton = None
+        if any_keywords:
+            self.keyword_automaton = ahocorasick.Automaton()
+            for kw, market_ids in any_keywords.items():
+                self.keyword_automaton.add_word(kw, (kw, market_ids))
+            self.keyword_automaton.make_automaton()
+
+    def match_keywords(self, text):
+        """Return {market_id: keyword} for every market whose keywords match text"""
+        matches = {}
+        for market_id in self.exact_keywords.get(text, ()):
+            matches[market_id] = text
+        
+        if self.keyword_automaton is not None:
+            for _, (kw, market_ids) in self.keyword_automaton.iter(text):
+                for market_id in market_ids:
+                    matches.setdefault(market_id, kw)
+        return matches
 
-    def process_audio(self):
-        """Process audio with better error handling and logging"""
+    def process_audio(self, audio_data):
+        """Run speech recognition on audio and hand finished transcripts to the matcher"""
+        try:
+            # Nothing left to trade; keep draining the stream without decoding it
+            if self.can_skip_recognition():
+                return
+            
+            if self.use_batch:
+                # The batch recognizer decodes asynchronously; drain whatever is ready
+                self.rec.AcceptWaveform(audio_data)
+                results = []
+                result = self.rec.Result()
+                while result:
+                    results.append(result)
+                    result = self.rec.Result()
+            elif self.rec.AcceptWaveform(audio_data):
+                results = [self.rec.Result()]
+            else:
+                results = []
+            
+            for result in results:
+                text = orjson.loads(result).get('text', '').lower().translate(PUNCTUATION_TABLE)
+                if text:
+                    self.text_queue.put((text, time.time()))
+        except Exception as e:
+            speech_logger.error(f"Error processing audio: {str(e)}")
+            speech_logger.error(traceback.format_exc())
+
+    def process_transcripts(self):
+        """Match finished transcripts against market keywords and schedule trades"""
         while True:
             try:
-                audio_data = self.audio_queue.get(timeout=5)
-                if not audio_data:
-                    speech_logger.warning("Received empty audio data")
-                    continue
+                text, detection_time = self.text_queue.get()
+                
+                # One clock read per transcript, shared by the log line and every detection
+                now = time.time()
+                if speech_logger.isEnabledFor(logging.INFO):
+                    speech_logger.info('[%s] "%s"', time.strftime('%H:%M:%S', time.localtime(now)), text)
+                
+                # Record all transcripts if configured
+                if self.transcript_logger:
+                    self.transcript_logger.info(text)
+                
+                detected_at = None
+                for market_id, detected_keyword in self.match_keywords(text).items():
+                    # Claim before scheduling so overlapping detections can't trade twice
+                    if not self.claims.claim(market_id):
+                        continue
                     
-                if self.rec.AcceptWaveform(audio_data):
-                    result = json.loads(self.rec.Result())
-                    text = result.get('text', '').lower()
+                    if detected_at is None:
+                        detected_at = datetime.fromtimestamp(now).isoformat()
+                    market_config = self.markets[market_id]
+                    detection_info = {
+                        "timestamp": detected_at,
+                        "market_id": market_id,
+                        "market_name": market_config.get('name', market_id),
+                        "detected_keyword": detected_keyword,
+                        "full_text": text
+                    }
                     
-                    if text:
-                        timestamp = datetime.now().strftime('%H:%M:%S')
-                        speech_logger.info(f"[{timestamp}] \"{text}\"")
-                        
-                        # Record all transcripts if configured
-                        if config.get_setting('app', 'record_all_transcripts', False):
-                            transcript_dir = os.path.join(config.get_setting('paths', 'logs', 'logs'), 'transcripts')
-                            os.makedirs(transcript_dir, exist_ok=True)
-                            with open(f"{transcript_dir}/transcript_{int(time.time())}.txt", 'w') as f:
-                                f.write(f"{timestamp}: {text}")
-                        
-                        for market_id, market_config in self.markets.items():
-                            if market_id in self.executed_markets and config.get_setting('trading', 'prevent_duplicate_trades', True):
-                                continue
-                                
-                            detected = False
-                            detected_keyword = None
-                            
-                            # Get keywords and trigger type from configuration
-                            keywords = market_config.get('keywords', [])
-                            trigger_type = market_config.get('trigger_type', 'any')
-                            
-                            # Override trigger type if configured globally
-                            if config.get_setting('speech', 'exact_matching', False):
-                                trigger_type = 'exact'
-                            
-                            if trigger_type == 'exact':
-                                # Check if any keyword exactly matches the text
-                                if text in keywords:
-                                    detected = True
-                                    detected_keyword = text
-                            elif trigger_type == 'any':
-                                # Check if any keyword is contained in the text
-                                for kw in keywords:
-                                    if kw in text:
-                                        detected = True
-                                        detected_keyword = kw
-                                        break
-                            
-                            if detected:
-                                detection_info = {
-                                    "timestamp": datetime.now().isoformat(),
-                                    "market_id": market_id,
-                                    "market_name": market_config.get('name', market_id),
-                                    "detected_keyword": detected_keyword,
-                                    "full_text": text
-                                }
-                                
-                                # Save detection to history and file
-                                self.detection_history.append(detection_info)
-                                
-                                # Save detection to file if configured
-                                if config.get_setting('speech', 'save_detections', True):
-                                    detections_dir = config.get_setting('paths', 'detections', 'detections')
-                                    with open(f"{detections_dir}/{market_id}_{int(time.time())}.json", 'w') as f:
-                                        json.dump(detection_info, f, indent=2)
-                                
-                                speech_logger.info(f"Keyword detected for {market_id}: '{detected_keyword}'")
-                                threading.Thread(
-                                    target=self.place_trade,
-                                    args=(market_id, market_config, detected_keyword, time.time())
-                                ).start()
-            except queue.Empty:
-                speech_logger.debug("Audio queue timeout - continuing")
-                continue
+                    # Save detection to history and file
+                    self.detection_history.append(detection_info)
+                    
+                    # Save detection to file if configured
+                    if self.save_detections:
+                        self.writer.append_record(f"{self.detections_dir}/{market_id}.ndjson", detection_info)
+                    
+                    speech_logger.info("Keyword detected for %s: '%s'", market_id, detected_keyword)
+                    self.trade_pool.submit(self.place_trade, market_id, market_config,
+                                           detected_keyword, detection_time)
             except Exception as e:
-                speech_logger.error(f"Error processing audio: {str(e)}")
+                speech_logger.error(f"Error processing transcript: {str(e)}")
                 speech_logger.error(traceback.format_exc())
-                time.sleep(1)  # Pause briefly before retrying
 
     def start(self):
         """Start the monitoring process with better error handling"""
@@ -392,42 +614,59 @@ class TwitterStreamTrader:
         
         try:
             process = self.get_audio_stream()
-            chunk_size = int(config.get_setting('speech', 'sample_rate', 16000) * 
-                            config.get_setting('speech', 'chunk_size', 1))
             
             main_logger.info("Monitoring markets:")
             for market_id, market_config in self.markets.items():
                 keywords = market_config.get('keywords', [])
                 main_logger.info(f"- {market_id} ({market_config.get('name', '')}): {keywords}")
             
-            # Start audio processing thread
-            audio_thread = threading.Thread(target=self.process_audio, daemon=True)
-            audio_thread.start()
-            main_logger.info("Audio processing thread started")
+            # Start file writer thread
+            self.writer.start()
+            
+            # Start keyword matching thread so detection I/O never stalls recognition
+            match_thread = threading.Thread(target=self.process_transcripts, daemon=True)
+            match_thread.start()
+            main_logger.info("Transcript matching thread started")
             
             main_logger.info("Beginning audio stream reading")
+            # Read the raw pipe and recognize each read in place; Vosk releases the GIL
+            # while decoding and the enlarged pipe absorbs FFmpeg output meanwhile
+            fd = process.stdout.fileno()
+            leftover = b''
             while True:
-                audio_data = process.stdout.read(chunk_size)
+                audio_data = os.read(fd, self.read_size)
                 if not audio_data:
                     main_logger.warning("Audio stream ended or returned no data")
                     
                     # Auto restart if configured
-                    if config.get_setting('app', 'auto_restart', True):
+                    if self.auto_restart:
                         main_logger.info("Attempting to restart audio stream...")
-                        process.terminate()
-                        process.wait()
+                        # FFmpeg failing (rather than the broadcast ending) usually means the URL went stale
+                        if self.stop_stream(process):
+                            self.invalidate_stream_url()
                         process = self.get_audio_stream()
+                        fd = process.stdout.fileno()
+                        leftover = b''
                         continue
                     else:
                         break
-                        
-                self.audio_queue.put(audio_data)
+                
+                # Vosk needs whole 16-bit samples; carry an odd trailing byte into the next read
+                if leftover:
+                    audio_data = leftover + audio_data
+                if len(audio_data) % 2:
+                    audio_data, leftover = audio_data[:-1], audio_data[-1:]
+                else:
+                    leftover = b''
+                
+                self.process_audio(audio_data)
                 
         except KeyboardInterrupt:
             main_logger.info("Received keyboard interrupt, shutting down")
             if 'process' in locals():
                 process.terminate()
                 process.wait()
+            self.close()
             main_logger.info("Shutdown complete")
         except Exception as e:
             main_logger.error(f"Error in main loop: {str(e)}")
@@ -435,32 +674,90 @@ class TwitterStreamTrader:
             if 'process' in locals():
                 process.terminate()
                 process.wait()
+            self.close()
+
+    def close(self):
+        """Stop accepting trades; trades already submitted finish in the background"""
+        self.trade_pool.shutdown(wait=False)
+        # Flush pending trade and detection files before exiting
+        self.writer.close()
+
+def enable_debug_logging():
+    """Send debug records from every logger to the log files and console"""
+    main_logger.setLevel(logging.DEBUG)
+    trade_logger.setLevel(logging.DEBUG)
+    speech_logger.setLevel(logging.DEBUG)
+    console_handler.setLevel(logging.DEBUG)
+
+def run_trader(url=None, debug=False, log_queue=None):
+    """Monitor a single Twitter URL until it stops; also the entry point of each worker process"""
+    if log_queue is not None:
+        forward_logs_to(log_queue)
+    if debug:
+        enable_debug_logging()
+    
+    try:
+        trader = TwitterStreamTrader(url)
+        trader.start()
+    except Exception as e:
+        main_logger.critical(f"Fatal error: {str(e)}")
+        main_logger.critical(traceback.format_exc())
+        return 1
+    
+    return 0
 
 def main():
     """Main entry point with command line argument handling"""
     parser = argparse.ArgumentParser(description='Polymarket trading based on Twitter speech recognition')
-    parser.add_argument('--url', type=str, help='Twitter URL to monitor')
+    parser.add_argument('--url', type=str, nargs='+',
+                        help='Twitter URL(s) to monitor; each URL gets its own process and recognizer')
     parser.add_argument('--debug', action='store_true', help='Enable debug logging')
     args = parser.parse_args()
     
     # Override debug setting if provided
     if args.debug:
-        main_logger.setLevel(logging.DEBUG)
-        trade_logger.setLevel(logging.DEBUG)
-        speech_logger.setLevel(logging.DEBUG)
+        enable_debug_logging()
         main_logger.debug("Debug mode enabled via command line")
     
     main_logger.info("Starting Twitter monitoring application")
     
+    if not args.url or len(args.url) == 1:
+        return run_trader(args.url[0] if args.url else None, args.debug)
+    
+    # Vosk decoding is CPU-bound, so run one trader per process to use one core per stream.
+    # Workers are spawned rather than forked; they only receive the URL and the log queue and
+    # rebuild config, models and clients themselves. Duplicate-trade tracking is per process.
+    context = multiprocessing.get_context('spawn')
+    
+    # Workers forward their records here, so every log file has a single writer that rotates it
+    log_queue = context.Queue()
+    log_listener = QueueListener(log_queue, ForwardedRecordHandler())
+    log_listener.start()
+    if config.get_setting('app', 'record_all_transcripts', False):
+        transcripts_dir = os.path.join(logs_dir, 'transcripts')
+        os.makedirs(transcripts_dir, exist_ok=True)
+        setup_transcript_logger('twitter_transcripts', os.path.join(transcripts_dir, 'twitter_transcripts.log'))
+    
+    processes = [
+        context.Process(target=run_trader, args=(url, args.debug, log_queue), name=f"trader-{i}")
+        for i, url in enumerate(args.url)
+    ]
+    for process, url in zip(processes, args.url):
+        process.start()
+        main_logger.info(f"Started {process.name} (pid {process.pid}) for {url}")
+    
     try:
-        trader = TwitterStreamTrader(args.url)
-        trader.start()
-    except Exception as e:
-        main_logger.critical(f"Fatal error: {str(e)}")
-        main_logger.critical(traceback.format_exc())
-        return 1
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        # Workers get the same interrupt and shut down on their own
+        main_logger.info("Received keyboard interrupt, waiting for traders to shut down")
+        for process in processes:
+            process.join()
+    finally:
+        log_listener.stop()
     
-    return 0
+    return 0 if all(process.exitcode == 0 for process in processes) else 1
 
 if __name__ == "__main__":
     sys.exit(main())
\ No newline at end of file
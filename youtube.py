@@ -1,26 +1,56 @@
 import subprocess
+import string
+import contextlib
+import tempfile
 import time
 import os
 from datetime import datetime
 from vosk import Model, KaldiRecognizer
+import ahocorasick
+import av
 import yt_dlp
 from py_clob_client.clob_types import OrderArgs
 from clob_client import create_clob_client
-import json
+import orjson
+import numpy as np
 import threading
+import collections
 import queue
+import copy
+import re
+import concurrent.futures
+import functools
+import multiprocessing
 import logging
-from logging.handlers import RotatingFileHandler
+import atexit
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 import traceback
 import backoff
 import argparse
 import sys
+from urllib.parse import urlparse, parse_qs
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+try:
+    import webrtcvad
+except ImportError:  # Optional: only needed when audio.vad_mode is set
+    webrtcvad = None
+
+try:
+    import sherpa_onnx
+except ImportError:  # Optional: only needed when speech.engine is sherpa_onnx
+    sherpa_onnx = None
 
 # Add the src directory to the path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
 # Import configuration loader
 from utils.config_loader import get_config
+from helpers.trading_support import MarketClaims, SignedOrderPool, RecordWriter
 
 # Get configuration
 config = get_config()
@@ -29,27 +59,78 @@ config = get_config()
 for path_name, path in config.settings.get('paths', {}).items():
     os.makedirs(path, exist_ok=True)
 
-# Configure logging
+# Transcripts and keywords are compared without punctuation ("mcdonald's" matches "mcdonalds")
+PUNCTUATION_TABLE = str.maketrans('', '', string.punctuation)
+
+# Configure logging; one formatter and one console handler are shared by every logger
+log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+# The console only shows warnings unless debug is enabled; the log files keep everything
+console_handler = logging.StreamHandler()
+console_handler.setFormatter(log_formatter)
+console_handler.setLevel(config.get_setting('app', 'console_log_level', 'WARNING'))
+
 def setup_logger(name, log_file, level=logging.INFO):
     """Function to set up a logger with a specific name and file"""
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    
     # File handler with rotation (10MB max size, keep 5 backups)
-    file_handler = RotatingFileHandler(log_file, maxBytes=10*1024*1024, backupCount=5)
-    file_handler.setFormatter(formatter)
+    file_handler = RotatingFileHandler(log_file, maxBytes=10*1024*1024, backupCount=5, delay=True)
+    file_handler.setFormatter(log_formatter)
     
-    # Console handler
-    console_handler = logging.StreamHandler()
-    console_handler.setFormatter(formatter)
+    # Callers only enqueue records; a listener thread writes them to the file and console
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
     
     # Create logger
     logger = logging.getLogger(name)
     logger.setLevel(level)
+    logger.addHandler(QueueHandler(log_queue))
+    logger.propagate = False
+    
+    return logger
+
+def setup_transcript_logger(name, log_file):
+    """Set up a file-only logger that appends every transcript to one rotating file"""
+    logger = logging.getLogger(name)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    
+    # Worker processes leave the file to the parent, see forward_logs_to
+    if worker_log_queue is not None:
+        logger.addHandler(worker_queue_handler())
+        return logger
+    
+    file_handler = RotatingFileHandler(log_file, maxBytes=10*1024*1024, backupCount=5)
+    file_handler.setFormatter(logging.Formatter('%(asctime)s: %(message)s'))
     logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
     
     return logger
 
+# Set in worker processes, whose records are written by the parent (see forward_logs_to)
+worker_log_queue = None
+
+def worker_queue_handler():
+    """Queue handler that sends a worker's records to the parent, tagged with the worker name"""
+    handler = QueueHandler(worker_log_queue)
+    handler.setFormatter(logging.Formatter('[%(processName)s] %(message)s'))
+    return handler
+
+def forward_logs_to(log_queue):
+    """Send this worker's log records to the parent process, which is the only writer of the log files"""
+    global worker_log_queue
+    worker_log_queue = log_queue
+    for logger in (main_logger, trade_logger, speech_logger):
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+        logger.addHandler(worker_queue_handler())
+
+class ForwardedRecordHandler(logging.Handler):
+    """Hand records forwarded by worker processes to the parent's logger of the same name"""
+    
+    def emit(self, record):
+        logging.getLogger(record.name).handle(record)
+
 # Get log paths from configuration
 logs_dir = config.get_setting('paths', 'logs', 'logs')
 main_logger = setup_logger('main', os.path.join(logs_dir, 'main.log'))
@@ -61,10 +142,114 @@ if config.get_setting('app', 'debug', False):
     main_logger.setLevel(logging.DEBUG)
     trade_logger.setLevel(logging.DEBUG)
     speech_logger.setLevel(logging.DEBUG)
+    console_handler.setLevel(logging.DEBUG)
     main_logger.debug("Debug mode enabled")
 
+class SherpaOnnxRecognizer:
+    """Streaming sherpa-onnx transducer behind Vosk's AcceptWaveform/Result interface"""
+    
+    def __init__(self, engine_config, sample_rate, provider='cpu'):
+        model_dir = engine_config.get('model_dir', '')
+        self.recognizer = sherpa_onnx.OnlineRecognizer.from_transducer(
+            tokens=os.path.join(model_dir, engine_config.get('tokens', 'tokens.txt')),
+            encoder=os.path.join(model_dir, engine_config['encoder']),
+            decoder=os.path.join(model_dir, engine_config['decoder']),
+            joiner=os.path.join(model_dir, engine_config['joiner']),
+            num_threads=engine_config.get('num_threads', 2),
+            sample_rate=sample_rate,
+            feature_dim=80,
+            decoding_method='greedy_search',
+            # Endpointing plays the role of Vosk's final results
+            enable_endpoint_detection=True,
+            provider=provider,
+        )
+        self.sample_rate = sample_rate
+        self.stream = self.recognizer.create_stream()
+        self.text = ''
+    
+    def AcceptWaveform(self, data):
+        """Decode a chunk of 16-bit PCM; True once an utterance has ended"""
+        samples = np.frombuffer(data, dtype=np.int16).astype(np.float32) / 32768
+        self.stream.accept_waveform(self.sample_rate, samples)
+        while self.recognizer.is_ready(self.stream):
+            self.recognizer.decode_stream(self.stream)
+        
+        if not self.recognizer.is_endpoint(self.stream):
+            return False
+        # Transducer vocabularies are uppercase; match Vosk's lowercase output
+        self.text = self.recognizer.get_result(self.stream).lower()
+        self.recognizer.reset(self.stream)
+        return True
+    
+    def Result(self):
+        """Text of the last finished utterance, as Vosk-style JSON"""
+        return orjson.dumps({'text': self.text}).decode()
+    
+    def PartialResult(self):
+        """Hypothesis for the utterance in progress, as Vosk-style JSON"""
+        return orjson.dumps({'partial': self.recognizer.get_result(self.stream).lower()}).decode()
+    
+    def Reset(self):
+        """Drop any partially decoded audio"""
+        self.recognizer.reset(self.stream)
+        self.text = ''
+
+class PyAVStream:
+    """Decode a stream URL to raw PCM in-process with PyAV, in place of an FFmpeg process"""
+    
+    def __init__(self, audio_url, sample_rate, channels):
+        # Same HTTP reconnect behaviour as the FFmpeg command line
+        self.container = av.open(audio_url, options={
+            'reconnect': '1',
+            'reconnect_streamed': '1',
+            'reconnect_delay_max': '30',
+        }, timeout=30)
+        self.stream = self.container.streams.audio[0]
+        self.resampler = av.AudioResampler(format='s16',
+                                           layout='mono' if channels == 1 else 'stereo',
+                                           rate=sample_rate)
+        self.frames = self.decode()
+        self.returncode = None
+    
+    def decode(self):
+        """Yield resampled PCM for each decoded frame"""
+        for frame in self.container.decode(self.stream):
+            for resampled in self.resampler.resample(frame):
+                # Packed s16 frames come back as a (1, samples * channels) int16 array
+                yield resampled.to_ndarray().tobytes()
+    
+    def read(self, size):
+        """Decode until at least size bytes of PCM are ready; empty once the stream has ended"""
+        parts = []
+        length = 0
+        try:
+            while length < size:
+                pcm = next(self.frames)
+                parts.append(pcm)
+                length += len(pcm)
+        except StopIteration:
+            # A failed decode also ends the generator; keep its status for poll()
+            if self.returncode is None:
+                self.returncode = 0
+        except av.error.FFmpegError as e:
+            main_logger.warning(f"PyAV decoding failed: {e}")
+            self.returncode = 1
+        return b''.join(parts)
+    
+    def poll(self):
+        """None while decoding, like Popen.poll; non-zero if decoding failed"""
+        return self.returncode
+    
+    def terminate(self):
+        """Close the input stream"""
+        self.container.close()
+    
+    def wait(self, timeout=None):
+        """Nothing to wait for in-process"""
+        return self.returncode
+
 class MultiMarketTrader:
-    def __init__(self, youtube_url=None):
+    def __init__(self, youtube_url=None, worker_index=0, worker_count=1):
         self.trading_client = None
         self.initialize_trading_client()
         
@@ -80,16 +265,101 @@ class MultiMarketTrader:
             
         main_logger.info(f"Using YouTube URL: {self.youtube_url}")
         
+        # Bytes read from FFmpeg per recognizer step and whether to reconnect when the stream ends
+        audio_config = youtube_config.get('audio', {})
+        self.read_size = audio_config.get('read_size', 6400)
+        self.decoder = audio_config.get('decoder', 'ffmpeg')
+        reconnect_config = youtube_config.get('reconnect', {})
+        self.auto_restart = config.get_setting('app', 'auto_restart', True) and reconnect_config.get('enabled', True)
+        self.reconnect_attempts = reconnect_config.get('max_attempts', 5)
+        self.reconnect_delay = reconnect_config.get('delay', 10)
+        
+        # Extracted audio URLs survive restarts here, so reconnecting skips yt-dlp while they are valid
+        self.stream_cache_path = os.path.join(config.get_setting('paths', 'logs', 'logs'), 'stream_cache.json')
+        
+        self.vad = None
+        self.initialize_vad(audio_config)
+        
         # Audio processing
-        self.audio_queue = queue.Queue(maxsize=10)
-        self.executed_markets = set()
+        # Lock-free hand-off from the reader: deque append/popleft are atomic, the event only wakes the
+        # recognizer when it has run dry. When full, the oldest chunk is dropped rather than blocking FFmpeg.
+        # Hold at least ~3 s of audio so short reads don't shrink the backlog the recognizer can catch up on
+        backlog_chunks = int(3 * audio_config.get('sample_rate', 16000) * 2 / self.read_size)
+        self.audio_queue = collections.deque(maxlen=max(16, backlog_chunks))
+        self.audio_ready = threading.Event()
+        # Dropped chunks are counted and leave a gap the recognizer resets across instead of decoding it
+        self.dropped_chunks = 0
+        self.last_drop_warning = 0.0
+        self.audio_gap = False
+        self.prevent_duplicate_trades = config.get_setting('trading', 'prevent_duplicate_trades', True)
+        self.claims = MarketClaims(self.prevent_duplicate_trades)
         self.detection_history = []
         
+        # Also trade on in-progress hypotheses; markets already hit in the current utterance are skipped
+        self.match_partials = config.get_setting('speech', 'match_partials', True)
+        self.utterance_markets = set()
+        self.last_partial = ''
+        
+        # Trade and detection files are written off the detection/trading path
+        self.save_detections = config.get_setting('speech', 'save_detections', True)
+        self.trades_dir = config.get_setting('paths', 'trades', 'trades')
+        self.detections_dir = config.get_setting('paths', 'detections', 'detections')
+        self.writer = RecordWriter(main_logger)
+        
+        # Record all transcripts to one rotating file if configured
+        self.transcript_logger = None
+        if config.get_setting('app', 'record_all_transcripts', False):
+            transcripts_dir = os.path.join(config.get_setting('paths', 'logs', 'logs'), 'transcripts')
+            os.makedirs(transcripts_dir, exist_ok=True)
+            self.transcript_logger = setup_transcript_logger(
+                'transcripts', os.path.join(transcripts_dir, 'transcripts.log'))
+        
         # Load markets from configuration
         self.markets = {}
         for market_id, market_data in config.get_enabled_markets().items():
             self.markets[market_id] = market_data
             main_logger.info(f"Loaded market: {market_id} - {market_data.get('name')}")
+        
+        self.build_keyword_matcher()
+        
+        # Restrict recognition to keyword vocabulary if configured
+        if config.get_setting('speech', 'use_grammar', False):
+            if self.engine != 'vosk':
+                main_logger.warning("Keyword grammar is only supported by Vosk, ignoring use_grammar")
+            else:
+                self.apply_keyword_grammar()
+        
+        self.warm_up_recognizer()
+        
+        # Order arguments never change per market, so build them once
+        self.order_templates = {
+            market_id: OrderArgs(
+                price=market_config['price'],
+                size=market_config['size'],
+                side=market_config['side'],
+                token_id=market_config['token_id'],
+            )
+            for market_id, market_config in self.markets.items()
+        }
+        
+        # CPU reserved for the recognizer thread; every other thread is kept on the remaining ones
+        self.cpu_affinity, recognizer_cpus = self.reserve_recognizer_cpus(worker_index, worker_count)
+        self.other_cpus = None
+        if self.cpu_affinity is not None and hasattr(os, 'sched_getaffinity'):
+            # Stay off every worker's recognizer CPU, not just this one
+            self.other_cpus = os.sched_getaffinity(0) - recognizer_cpus
+        
+        # Reuse warm worker threads for trades instead of spawning one per detection
+        self.trade_pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=config.get_setting('trading', 'max_concurrent_orders', 8),
+            thread_name_prefix="trade",
+            # Workers are spawned lazily by whichever thread submits, so set their affinity explicitly
+            initializer=self.avoid_recognizer_cpu if self.cpu_affinity is not None else None)
+        
+        # Orders signed ahead of time, so a detection only has to post one
+        self.signed_orders = SignedOrderPool(self.trading_client, self.order_templates,
+                                             config.get_setting('trading', 'presigned_orders', 2), trade_logger)
+        self.signed_orders.fill(self.trade_pool)
 
     def initialize_trading_client(self):
         """Initialize trading client with retries"""
@@ -105,6 +375,27 @@ class MultiMarketTrader:
     def initialize_speech_recognition(self):
         """Initialize speech recognition with error handling"""
         try:
+            self.engine = config.get_setting('speech', 'engine', 'vosk')
+            if self.engine == 'sherpa_onnx':
+                if sherpa_onnx is None:
+                    raise ImportError("speech.engine is sherpa_onnx but the sherpa-onnx package is not installed")
+                main_logger.info("Loading sherpa-onnx model")
+                engine_config = config.get_setting('speech', 'sherpa_onnx', {})
+                sample_rate = config.get_setting('speech', 'sample_rate', 16000)
+                provider = engine_config.get('provider', 'cpu')
+                if provider != 'cpu':
+                    try:
+                        # Runs the acoustic model on the GPU, needs an onnxruntime build for that provider
+                        self.rec = SherpaOnnxRecognizer(engine_config, sample_rate, provider)
+                        main_logger.info(f"Using sherpa-onnx with the {provider} provider")
+                    except Exception as e:
+                        main_logger.warning(f"sherpa-onnx {provider} provider unavailable, falling back to CPU: {str(e)}")
+                        provider = 'cpu'
+                if provider == 'cpu':
+                    self.rec = SherpaOnnxRecognizer(engine_config, sample_rate)
+                main_logger.info("Speech recognition model loaded successfully")
+                return
+            
             main_logger.info("Loading Vosk model")
             model_name = config.get_setting('speech', 'model_name', "vosk-model-small-en-us-0.15")
             
@@ -112,126 +403,312 @@ class MultiMarketTrader:
                 main_logger.warning(f"Model directory {model_name} not found. Please ensure it's downloaded")
                 main_logger.info("You can download it from: https://alphacephei.com/vosk/models/vosk-model-small-en-us-0.15.zip")
             
-            self.model = Model(model_name)
+            with self.tuned_model_dir(model_name) as model_dir:
+                self.model = Model(model_dir)
             self.rec = KaldiRecognizer(self.model, config.get_setting('speech', 'sample_rate', 16000))
+            # Only the transcript text is used, skip word timings in results
+            self.rec.SetWords(False)
             main_logger.info("Speech recognition model loaded successfully")
         except Exception as e:
             main_logger.error(f"Failed to initialize speech recognition: {str(e)}")
             main_logger.error(traceback.format_exc())
             raise
 
+    def warm_up_recognizer(self):
+        """Decode a few seconds of silence at startup so the first live audio hits a primed decoder"""
+        warmup_seconds = config.get_setting('speech', 'warmup_seconds', 8)
+        if not warmup_seconds:
+            return
+        
+        # Feed the same chunk size as live audio
+        step = self.read_size
+        silence = bytes(step)
+        for _ in range(int(warmup_seconds * config.get_setting('speech', 'sample_rate', 16000) * 2) // step):
+            self.rec.AcceptWaveform(silence)
+        self.rec.Reset()
+        main_logger.info(f"Recognizer warmed up with {warmup_seconds}s of silence")
+
+    @contextlib.contextmanager
+    def tuned_model_dir(self, model_name):
+        """Model directory to load, with speech.decoder_options applied to a private copy of conf/model.conf"""
+        options = config.get_setting('speech', 'decoder_options', {})
+        conf_dir = os.path.join(model_name, 'conf')
+        conf_path = os.path.join(conf_dir, 'model.conf')
+        if not options or not os.path.exists(conf_path):
+            yield model_name
+            return
+        
+        with open(conf_path) as f:
+            lines = f.read().splitlines()
+        
+        # Replace options the model already sets, append the rest
+        wanted = {f'--{key}': str(value) for key, value in options.items()}
+        tuned = []
+        for line in lines:
+            key = line.split('=', 1)[0].strip()
+            if key in wanted:
+                line = f'{key}={wanted.pop(key)}'
+            tuned.append(line)
+        tuned.extend(f'{key}={value}' for key, value in wanted.items())
+        
+        # The downloaded model is shared with the other traders, so link its files into a temporary
+        # directory and only write the tuned model.conf there; Vosk reads it all while loading
+        with tempfile.TemporaryDirectory(prefix='vosk-model-') as tuned_dir:
+            os.mkdir(os.path.join(tuned_dir, 'conf'))
+            for entry in os.listdir(model_name):
+                if entry != 'conf':
+                    os.symlink(os.path.abspath(os.path.join(model_name, entry)), os.path.join(tuned_dir, entry))
+            for entry in os.listdir(conf_dir):
+                if entry != 'model.conf':
+                    os.symlink(os.path.abspath(os.path.join(conf_dir, entry)), os.path.join(tuned_dir, 'conf', entry))
+            with open(os.path.join(tuned_dir, 'conf', 'model.conf'), 'w') as f:
+                f.write('\n'.join(tuned) + '\n')
+            main_logger.info(f"Loading {model_name} with decoder options: {options}")
+            yield tuned_dir
+
+    def apply_keyword_grammar(self):
+        """Limit the recognizer's search space to the words used by market keywords"""
+        words = {word for market_config in self.markets.values()
+                 for kw in market_config.get('keywords', []) for word in kw.lower().split()}
+        # [unk] absorbs all other speech so it is not forced onto a keyword
+        grammar = orjson.dumps(sorted(words) + ['[unk]']).decode()
+        self.rec.SetGrammar(grammar)
+        main_logger.info(f"Recognizer grammar limited to {len(words)} keyword words")
+
+    def initialize_vad(self, audio_config):
+        """Set up the optional voice activity detector that keeps silence away from the recognizer"""
+        vad_mode = audio_config.get('vad_mode')
+        if vad_mode is None:
+            return
+        if webrtcvad is None:
+            main_logger.warning("audio.vad_mode is set but webrtcvad is not installed, decoding all audio")
+            return
+        
+        self.vad = webrtcvad.Vad(vad_mode)
+        self.vad_sample_rate = audio_config.get('sample_rate', 16000)
+        # WebRTC VAD classifies 10, 20 or 30 ms frames of 16-bit mono PCM
+        self.vad_frame_bytes = self.vad_sample_rate * 30 // 1000 * 2
+        # Reads come in any length; the partial frame at the end of one is classified with the next
+        self.vad_leftover = b''
+        # Keep decoding this much silence after speech so Vosk can detect the end of the utterance
+        self.vad_hangover_bytes = int(audio_config.get('vad_hangover', 1.0) * self.vad_sample_rate * 2)
+        # Mean square level (of full scale) below which a chunk is dead air without asking the VAD
+        self.vad_energy_floor = audio_config.get('vad_energy_floor', 1e-4) * 32768 ** 2
+        self.silence_bytes = 0
+        main_logger.info(f"Voice activity detection enabled (mode {vad_mode})")
+
+    def is_speech(self, audio_data):
+        """Whether any whole frame of a chunk, continuing the previous chunk's tail, contains speech"""
+        frame_bytes = self.vad_frame_bytes
+        frames = self.vad_leftover + audio_data if self.vad_leftover else audio_data
+        whole = len(frames) - len(frames) % frame_bytes
+        self.vad_leftover = frames[whole:]
+        
+        # One vectorized energy check rejects silent chunks before the per-frame VAD calls
+        samples = np.frombuffer(audio_data, dtype=np.int16).astype(np.float32)
+        if samples.size and np.dot(samples, samples) / samples.size < self.vad_energy_floor:
+            return False
+        
+        for offset in range(0, whole, frame_bytes):
+            if self.vad.is_speech(frames[offset:offset + frame_bytes], self.vad_sample_rate):
+                return True
+        return False
+
+    def should_decode(self, audio_data):
+        """Whether a chunk needs the recognizer: it contains speech or ends a recent utterance"""
+        if self.is_speech(audio_data):
+            self.silence_bytes = 0
+            return True
+        self.silence_bytes += len(audio_data)
+        return self.silence_bytes <= self.vad_hangover_bytes
+
     @backoff.on_exception(backoff.expo, 
                          (Exception),
                          max_tries=5,
                          jitter=backoff.full_jitter)
-    def create_and_submit_order(self, token_id, side, price, size):
+    def create_and_submit_order(self, order_args, signed_order=None):
         """Create and submit order with exponential backoff retry"""
         try:
-            trade_logger.info(f"Creating order: token_id={token_id}, side={side}, price={price}, size={size}")
-            
-            order_args = OrderArgs(
-                price=price,
-                size=size,
-                side=side,
-                token_id=token_id,
-            )
+            trade_logger.info("Creating order: token_id=%s, side=%s, price=%s, size=%s",
+                              order_args.token_id, order_args.side, order_args.price, order_args.size)
             
-            signed_order = self.trading_client.create_order(order_args)
-            trade_logger.info(f"Order created successfully")
+            if signed_order is None:
+                signed_order = self.trading_client.create_order(order_args)
+                trade_logger.info("Order created successfully")
             
             response = self.trading_client.post_order(signed_order)
-            trade_logger.info(f"Order submitted successfully: {response}")
+            trade_logger.info("Order submitted successfully: %s", response)
             
             return response
         except Exception as e:
-            trade_logger.error(f"Order Error: {str(e)}")
-            trade_logger.error(traceback.format_exc())
+            trade_logger.exception("Order Error: %s", e)
             raise
 
     def place_trade(self, market_id, market_config, detected_keyword, detection_time):
         """Place a trade with comprehensive logging"""
         try:
+            started = time.time()
             trade_info = {
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": datetime.fromtimestamp(started).isoformat(),
                 "market_id": market_id,
                 "market_name": market_config.get('name', market_id),
                 "detected_keyword": detected_keyword,
-                "detection_latency": time.time() - detection_time,
+                "detection_latency": started - detection_time,
                 "status": "pending"
             }
             
-            trade_logger.info(f"Executing trade for {market_id} triggered by '{detected_keyword}'")
+            trade_logger.info("Executing trade for %s triggered by '%s'", market_id, detected_keyword)
             
-            # Check if we've already executed this market
-            if config.get_setting('trading', 'prevent_duplicate_trades', True) and market_id in self.executed_markets:
-                trade_logger.warning(f"Skipping trade for {market_id} - already executed")
-                trade_info["status"] = "skipped"
-                trade_info["reason"] = "already_executed"
-                return
+            # Post a pre-signed order if one is ready, otherwise sign now
+            signed_order = self.signed_orders.take(market_id)
             
-            resp = self.create_and_submit_order(
-                token_id=market_config['token_id'],
-                side=market_config['side'],
-                price=market_config['price'],
-                size=market_config['size']
-            )
+            # Copy the template so the client can't alter it between trades
+            resp = self.create_and_submit_order(copy.copy(self.order_templates[market_id]), signed_order)
             
             if resp:
-                self.executed_markets.add(market_id)
                 latency = time.time() - detection_time
                 
                 trade_info["status"] = "success"
                 trade_info["order_response"] = resp
                 trade_info["execution_latency"] = latency
                 
-                trade_logger.info(f"Trade executed - {market_id} - Latency: {latency:.3f}s")
-                trade_logger.info(f"Response: {resp}")
+                trade_logger.info("Trade executed - %s - Latency: %.3fs", market_id, latency)
+                trade_logger.info("Response: %s", resp)
                 
                 # Save trade to file
-                trades_dir = config.get_setting('paths', 'trades', 'trades')
-                with open(f"{trades_dir}/{market_id}_{int(time.time())}.json", 'w') as f:
-                    json.dump(trade_info, f, indent=2)
+                self.writer.append_record(f"{self.trades_dir}/{market_id}.ndjson", trade_info)
             else:
+                self.claims.release(market_id)
                 trade_info["status"] = "failed"
-                trade_logger.error(f"Trade failed - {market_id}: No response from server")
+                trade_logger.error("Trade failed - %s: No response from server", market_id)
+                
+                # Save trade error to file
+                self.writer.append_record(f"{self.trades_dir}/{market_id}.ndjson", trade_info)
         except Exception as e:
+            self.claims.release(market_id)
             trade_info["status"] = "error"
             trade_info["error"] = str(e)
-            trade_logger.error(f"Trade failed - {market_id}: {str(e)}")
-            trade_logger.error(traceback.format_exc())
+            # exception() only walks the traceback if the record is emitted
+            trade_logger.exception("Trade failed - %s: %s", market_id, e)
             
             # Save trade error to file
-            trades_dir = config.get_setting('paths', 'trades', 'trades')
-            with open(f"{trades_dir}/{market_id}_error_{int(time.time())}.json", 'w') as f:
-                json.dump(trade_info, f, indent=2)
+            self.writer.append_record(f"{self.trades_dir}/{market_id}.ndjson", trade_info)
+        
+        # Sign the next order off the critical path if this market can trade again
+        if self.claims.can_trade_again(market_id):
+            self.signed_orders.refill(market_id)
+
+    def can_skip_recognition(self):
+        """Whether decoding is wasted work: every market has traded and transcripts aren't recorded"""
+        return self.transcript_logger is None and self.claims.all_claimed(len(self.markets))
+
+    def get_stream_url(self):
+        """Get the audio URL, reusing a cached one until ten minutes before it expires"""
+        cached = self.load_stream_cache().get(self.youtube_url)
+        if cached and cached.get('audio_url') and cached.get('expires_at', 0) - time.time() > 600:
+            main_logger.info("Reusing cached audio URL")
+            return cached['audio_url']
+        
+        audio_url = self.resolve_stream_url()
+        # URLs without a known expiry are resolved again each time rather than cached
+        expires_at = self.stream_url_expiry(audio_url)
+        if expires_at is not None:
+            self.save_stream_cache(audio_url, expires_at)
+        return audio_url
+
+    def invalidate_stream_url(self):
+        """Forget the cached audio URL so the next lookup runs yt-dlp again"""
+        self.save_stream_cache(None, 0)
+
+    def stream_url_expiry(self, audio_url):
+        """Read the expiry timestamp signed into a googlevideo URL, None if it carries none"""
+        parsed = urlparse(audio_url)
+        try:
+            return float(parse_qs(parsed.query)['expire'][0])
+        except (KeyError, ValueError):
+            pass
+        # Live HLS manifests carry their parameters in the path instead
+        match = re.search(r'/expire/(\d+)', parsed.path)
+        if match:
+            return float(match.group(1))
+        return None
+
+    def load_stream_cache(self):
+        """Read the on-disk audio URL cache, empty if missing or unreadable"""
+        try:
+            with open(self.stream_cache_path, 'rb') as f:
+                return orjson.loads(f.read())
+        except (OSError, orjson.JSONDecodeError):
+            return {}
+
+    def save_stream_cache(self, audio_url, expires_at):
+        """Store (or with no URL, drop) the cached audio URL for this YouTube URL"""
+        cache = self.load_stream_cache()
+        if audio_url:
+            cache[self.youtube_url] = {'audio_url': audio_url, 'expires_at': expires_at}
+        elif cache.pop(self.youtube_url, None) is None:
+            return
+        
+        # Replace atomically so traders in other processes never read a partial file
+        tmp_path = f"{self.stream_cache_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(orjson.dumps(cache))
+            os.replace(tmp_path, self.stream_cache_path)
+        except OSError as e:
+            main_logger.warning(f"Could not write stream cache: {str(e)}")
+
+    def resolve_stream_url(self):
+        """Extract the audio URL for the YouTube URL with yt-dlp"""
+        # Get yt-dlp options from configuration
+        youtube_config = config.get_source_config('youtube')
+        ytdlp_options = youtube_config.get('ytdlp_options', {'format': 'bestaudio', 'quiet': True})
+        
+        with yt_dlp.YoutubeDL(ytdlp_options) as ydl:
+            main_logger.info("Extracting info with yt-dlp")
+            info = ydl.extract_info(self.youtube_url, download=False)
+            main_logger.info("Successfully extracted audio URL")
+            return info['url']
 
     def get_audio_stream(self):
         """Get audio stream with better error handling"""
         try:
             main_logger.info(f"Getting audio stream for YouTube URL: {self.youtube_url}")
-            
-            # Get yt-dlp options from configuration
+            audio_url = self.get_stream_url()
             youtube_config = config.get_source_config('youtube')
-            ytdlp_options = youtube_config.get('ytdlp_options', {'format': 'bestaudio', 'quiet': True})
-            
-            with yt_dlp.YoutubeDL(ytdlp_options) as ydl:
-                main_logger.info("Extracting info with yt-dlp")
-                info = ydl.extract_info(self.youtube_url, download=False)
-                audio_url = info['url']
-                main_logger.info("Successfully extracted audio URL")
             
             # Get audio processing options from configuration
             audio_config = youtube_config.get('audio', {})
             codec = audio_config.get('codec', 'pcm_s16le')
             sample_rate = audio_config.get('sample_rate', 16000)
             channels = audio_config.get('channels', 1)
+            input_flags = audio_config.get('ffmpeg_input_flags', [])
+            
+            if self.decoder == 'pyav':
+                main_logger.info("Starting in-process PyAV decoder")
+                stream = PyAVStream(audio_url, sample_rate, channels)
+                main_logger.info("PyAV decoder started successfully")
+                return stream
             
             main_logger.info("Starting FFmpeg process")
             process = subprocess.Popen([
-                'ffmpeg', '-i', audio_url,
+                'ffmpeg', '-loglevel', 'error',
+                # Let FFmpeg retry dropped HTTP connections itself instead of ending the stream
+                '-reconnect', '1',
+                '-reconnect_streamed', '1',
+                '-reconnect_delay_max', '30',
+                *input_flags,
+                '-i', audio_url,
                 '-acodec', codec, '-ar', str(sample_rate), 
                 '-ac', str(channels), '-f', 'wav', '-'
-            ], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            ], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+            
+            # A larger pipe lets FFmpeg keep decoding while the reader is busy (Linux only)
+            if fcntl is not None and hasattr(fcntl, 'F_SETPIPE_SZ'):
+                try:
+                    fcntl.fcntl(process.stdout.fileno(), fcntl.F_SETPIPE_SZ, 1 << 20)
+                except OSError as e:
+                    main_logger.debug(f"Could not enlarge FFmpeg pipe: {e}")
             
             main_logger.info("FFmpeg process started successfully")
             return process
@@ -240,131 +717,304 @@ class MultiMarketTrader:
             main_logger.error(traceback.format_exc())
             raise
 
+    def stop_stream(self, process):
+        """Stop the decoder once its output has ended; True if it had exited with an error by itself"""
+        # stdout reaches EOF a moment before FFmpeg is reaped, so poll() would usually still
+        # report it as running. Give it a few seconds to exit and read its own exit status
+        try:
+            failed = process.wait(timeout=5) != 0
+        except subprocess.TimeoutExpired:
+            # Still running, so it did not fail by itself; the SIGTERM below says nothing about the URL
+            failed = False
+        process.terminate()
+        process.wait()
+        return failed
+
+    def reconnect(self):
+        """Restart the audio stream, retrying with a delay; None once every attempt has failed"""
+        for attempt in range(1, self.reconnect_attempts + 1):
+            try:
+                return self.get_audio_stream()
+            except Exception as e:
+                main_logger.warning(f"Reconnect attempt {attempt}/{self.reconnect_attempts} failed: {str(e)}")
+                # The cached URL may be what failed; extract a fresh one next time
+                self.invalidate_stream_url()
+                time.sleep(self.reconnect_delay)
+        main_logger.error("Could not reconnect to the audio stream, giving up")
+        return None
+
+    def build_keyword_matcher(self):
+        """Index market keywords so each transcript is scanned in a single pass"""
+        exact_matching = config.get_setting('speech', 'exact_matching', False)
+        
+        # keyword -> market ids, split by trigger type
+        self.exact_keywords = {}
+        any_keywords = {}
+        for market_id, market_config in self.markets.items():
+            trigger_type = 'exact' if exact_matching else market_config.get('trigger_type', 'any')
+            if trigger_type == 'exact':
+                index = self.exact_keywords
+            elif trigger_type == 'any':
+                index = any_keywords
+            else:
+                main_logger.warning(f"Unknown trigger type '{trigger_type}' for {market_id}")
+                continue
+            # Normalize keywords the same way as transcripts
+            for kw in market_config.get('keywords', []):
+                index.setdefault(kw.lower().translate(PUNCTUATION_TABLE), []).append(market_id)
+        
+        # Aho-Corasick automaton over all substring keywords
+        self.keyword_automaton = None
+        if any_keywords:
+            self.keyword_automaton = ahocorasick.Automaton()
+            for kw, market_ids in any_keywords.items():
+                self.keyword_automaton.add_word(kw, (kw, market_ids))
+            self.keyword_automaton.make_automaton()
+
+    def match_keywords(self, text):
+        """Return {market_id: keyword} for every market whose keywords match text"""
+        matches = {}
+        for market_id in self.exact_keywords.get(text, ()):
+            matches[market_id] = text
+        
+        if self.keyword_automaton is not None:
+            for _, (kw, market_ids) in self.keyword_automaton.iter(text):
+                for market_id in market_ids:
+                    matches.setdefault(market_id, kw)
+        return matches
+
+    def raise_thread_priority(self):
+        """Schedule the calling thread ahead of other work so decoding keeps up with the stream"""
+        # Both calls apply to the calling thread on Linux and need CAP_SYS_NICE (or root)
+        try:
+            os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(10))
+            speech_logger.info("Recognizer thread running with SCHED_FIFO priority")
+            return
+        except (AttributeError, PermissionError, OSError):
+            pass
+        try:
+            os.nice(-5)
+            speech_logger.info("Recognizer thread niceness lowered by 5")
+        except (AttributeError, PermissionError, OSError) as e:
+            speech_logger.warning(f"Could not raise recognizer thread priority: {e}")
+
+    def reserve_recognizer_cpus(self, worker_index, worker_count):
+        """CPU for this trader's recognizer and the set reserved for the recognizers of all workers"""
+        setting = config.get_setting('speech', 'cpu_affinity', None)
+        if setting is None:
+            return None, set()
+        
+        # A list gives one CPU per stream; a single CPU is the first of consecutive ones
+        if isinstance(setting, list):
+            cpus = setting[:worker_count]
+        else:
+            cpus = [setting + i for i in range(worker_count)]
+        if len(set(cpus)) < worker_count:
+            main_logger.warning(f"speech.cpu_affinity needs a distinct CPU for each of {worker_count} streams, "
+                                f"got {setting}; not pinning recognizer threads")
+            return None, set()
+        return cpus[worker_index], set(cpus)
+
+    def pin_recognizer_thread(self):
+        """Run the calling thread only on the CPU reserved for the recognizer (Linux only)"""
+        try:
+            os.sched_setaffinity(0, {self.cpu_affinity})
+            speech_logger.info(f"Recognizer thread pinned to CPU {self.cpu_affinity}")
+        except (AttributeError, OSError) as e:
+            speech_logger.warning(f"Could not pin recognizer thread to CPU {self.cpu_affinity}: {e}")
+
+    def avoid_recognizer_cpu(self, thread_id=0):
+        """Keep a thread (the calling one by default) off the CPU reserved for the recognizer"""
+        if not self.other_cpus:
+            return
+        try:
+            os.sched_setaffinity(thread_id, self.other_cpus)
+        except OSError as e:
+            main_logger.debug(f"Could not set thread affinity: {e}")
+
+    def note_dropped_chunk(self):
+        """Count a chunk pushed out of the full audio queue, warning at most every 10 seconds"""
+        self.dropped_chunks += 1
+        self.audio_gap = True
+        now = time.monotonic()
+        if now - self.last_drop_warning >= 10:
+            self.last_drop_warning = now
+            speech_logger.warning("Recognizer is falling behind: %d audio chunks dropped so far",
+                                  self.dropped_chunks)
+
     def process_audio(self):
         """Process audio with better error handling and logging"""
+        if self.cpu_affinity is not None:
+            self.pin_recognizer_thread()
+        if config.get_setting('speech', 'realtime_priority', False):
+            self.raise_thread_priority()
+        
         while True:
             try:
-                audio_data = self.audio_queue.get(timeout=5)
+                if not self.audio_queue:
+                    if not self.audio_ready.wait(timeout=5):
+                        speech_logger.debug("Audio queue timeout - continuing")
+                    self.audio_ready.clear()
+                    continue
+                audio_data = self.audio_queue.popleft()
                 if not audio_data:
                     speech_logger.warning("Received empty audio data")
                     continue
+                
+                # Older audio was dropped; start a fresh utterance rather than decode spliced audio
+                if self.audio_gap:
+                    self.audio_gap = False
+                    self.rec.Reset()
+                    self.utterance_markets.clear()
+                    self.last_partial = ''
+                    if self.vad:
+                        self.vad_leftover = b''
+                
+                # Nothing left to trade; keep draining the stream without decoding it
+                if self.can_skip_recognition():
+                    continue
+                
+                # Skip the decoder on silence and music once the last utterance has been closed
+                if self.vad and not self.should_decode(audio_data):
+                    continue
                     
                 if self.rec.AcceptWaveform(audio_data):
-                    result = json.loads(self.rec.Result())
-                    text = result.get('text', '').lower()
+                    result = orjson.loads(self.rec.Result())
+                    # Vosk already emits lowercase words, only punctuation needs stripping
+                    text = result.get('text', '').translate(PUNCTUATION_TABLE)
                     
                     if text:
-                        timestamp = datetime.now().strftime('%H:%M:%S')
-                        speech_logger.info(f"[{timestamp}] \"{text}\"")
+                        # One clock read per transcript, shared by the log line, files and trades
+                        now = time.time()
+                        if speech_logger.isEnabledFor(logging.INFO):
+                            speech_logger.info('[%s] "%s"', time.strftime('%H:%M:%S', time.localtime(now)), text)
                         
                         # Record all transcripts if configured
-                        if config.get_setting('app', 'record_all_transcripts', False):
-                            transcript_dir = os.path.join(config.get_setting('paths', 'logs', 'logs'), 'transcripts')
-                            os.makedirs(transcript_dir, exist_ok=True)
-                            with open(f"{transcript_dir}/transcript_{int(time.time())}.txt", 'w') as f:
-                                f.write(f"{timestamp}: {text}")
+                        if self.transcript_logger:
+                            self.transcript_logger.info(text)
                         
-                        for market_id, market_config in self.markets.items():
-                            if market_id in self.executed_markets and config.get_setting('trading', 'prevent_duplicate_trades', True):
-                                continue
-                                
-                            detected = False
-                            detected_keyword = None
-                            
-                            # Get keywords and trigger type from configuration
-                            keywords = market_config.get('keywords', [])
-                            trigger_type = market_config.get('trigger_type', 'any')
-                            
-                            # Override trigger type if configured globally
-                            if config.get_setting('speech', 'exact_matching', False):
-                                trigger_type = 'exact'
-                            
-                            if trigger_type == 'exact':
-                                # Check if any keyword exactly matches the text
-                                if text in keywords:
-                                    detected = True
-                                    detected_keyword = text
-                            elif trigger_type == 'any':
-                                # Check if any keyword is contained in the text
-                                for kw in keywords:
-                                    if kw in text:
-                                        detected = True
-                                        detected_keyword = kw
-                                        break
-                            
-                            if detected:
-                                detection_info = {
-                                    "timestamp": datetime.now().isoformat(),
-                                    "market_id": market_id,
-                                    "market_name": market_config.get('name', market_id),
-                                    "detected_keyword": detected_keyword,
-                                    "full_text": text
-                                }
-                                
-                                # Save detection to history and file
-                                self.detection_history.append(detection_info)
-                                
-                                # Save detection to file if configured
-                                if config.get_setting('speech', 'save_detections', True):
-                                    detections_dir = config.get_setting('paths', 'detections', 'detections')
-                                    with open(f"{detections_dir}/{market_id}_{int(time.time())}.json", 'w') as f:
-                                        json.dump(detection_info, f, indent=2)
-                                
-                                speech_logger.info(f"Keyword detected for {market_id}: '{detected_keyword}'")
-                                threading.Thread(
-                                    target=self.place_trade,
-                                    args=(market_id, market_config, detected_keyword, time.time())
-                                ).start()
-            except queue.Empty:
-                speech_logger.debug("Audio queue timeout - continuing")
-                continue
+                        self.detect_keywords(text, now)
+                    
+                    # The utterance is committed, partials of the next one start fresh
+                    self.utterance_markets.clear()
+                    self.last_partial = ''
+                elif self.match_partials:
+                    # The hypothesis usually doesn't change between chunks; skip parsing until it does
+                    partial_json = self.rec.PartialResult()
+                    if partial_json != self.last_partial:
+                        self.last_partial = partial_json
+                        partial = orjson.loads(partial_json).get('partial', '').translate(PUNCTUATION_TABLE)
+                        if partial:
+                            self.detect_keywords(partial, time.time())
             except Exception as e:
                 speech_logger.error(f"Error processing audio: {str(e)}")
                 speech_logger.error(traceback.format_exc())
                 time.sleep(1)  # Pause briefly before retrying
 
+    def detect_keywords(self, text, now):
+        """Record detections for text and start a trade for each newly matched market"""
+        detected_at = None
+        for market_id, detected_keyword in self.match_keywords(text).items():
+            # A keyword stays in every partial of its utterance; only the first one trades
+            if market_id in self.utterance_markets:
+                continue
+            # Claim before scheduling so duplicates never reach the trade pool
+            if not self.claims.claim(market_id):
+                continue
+            self.utterance_markets.add(market_id)
+            
+            if detected_at is None:
+                detected_at = datetime.fromtimestamp(now).isoformat()
+            market_config = self.markets[market_id]
+            detection_info = {
+                "timestamp": detected_at,
+                "market_id": market_id,
+                "market_name": market_config.get('name', market_id),
+                "detected_keyword": detected_keyword,
+                "full_text": text
+            }
+            
+            # Save detection to history and file
+            self.detection_history.append(detection_info)
+            
+            # Save detection to file if configured
+            if self.save_detections:
+                self.writer.append_record(f"{self.detections_dir}/{market_id}.ndjson", detection_info)
+            
+            speech_logger.info("Keyword detected for %s: '%s'", market_id, detected_keyword)
+            self.trade_pool.submit(self.place_trade, market_id, market_config,
+                                   detected_keyword, now)
+
     def start(self):
         """Start the monitoring process with better error handling"""
         main_logger.info(f"Starting MultiMarketTrader for URL: {self.youtube_url}")
         
         try:
+            # Move the reader and log listeners off the recognizer's CPU; FFmpeg and the threads
+            # started below inherit it
+            if self.cpu_affinity is not None:
+                for thread in threading.enumerate():
+                    self.avoid_recognizer_cpu(thread.native_id)
+            
             process = self.get_audio_stream()
-            chunk_size = int(config.get_setting('speech', 'sample_rate', 16000) * 
-                            config.get_setting('speech', 'chunk_size', 1))
             
             main_logger.info("Monitoring markets:")
             for market_id, market_config in self.markets.items():
                 keywords = market_config.get('keywords', [])
                 main_logger.info(f"- {market_id} ({market_config.get('name', '')}): {keywords}")
             
+            # Start file writer thread
+            self.writer.start()
+            
             # Start audio processing thread
             audio_thread = threading.Thread(target=self.process_audio, daemon=True)
             audio_thread.start()
             main_logger.info("Audio processing thread started")
             
             main_logger.info("Beginning audio stream reading")
+            read = self.stream_reader(process)
+            leftover = b''
             while True:
-                audio_data = process.stdout.read(chunk_size)
+                audio_data = read(self.read_size)
                 if not audio_data:
                     main_logger.warning("Audio stream ended or returned no data")
                     
                     # Auto restart if configured
-                    if config.get_setting('app', 'auto_restart', True):
+                    if self.auto_restart:
                         main_logger.info("Attempting to restart audio stream...")
-                        process.terminate()
-                        process.wait()
-                        process = self.get_audio_stream()
+                        # FFmpeg failing (rather than the stream ending) usually means the URL went stale
+                        if self.stop_stream(process):
+                            self.invalidate_stream_url()
+                        process = self.reconnect()
+                        if process is None:
+                            break
+                        read = self.stream_reader(process)
+                        leftover = b''
                         continue
                     else:
                         break
-                        
-                self.audio_queue.put(audio_data)
+                
+                # Vosk needs whole 16-bit samples; carry an odd trailing byte into the next read
+                if leftover:
+                    audio_data = leftover + audio_data
+                if len(audio_data) % 2:
+                    audio_data, leftover = audio_data[:-1], audio_data[-1:]
+                else:
+                    leftover = b''
+                if not audio_data:
+                    continue
+                
+                if len(self.audio_queue) == self.audio_queue.maxlen:
+                    self.note_dropped_chunk()
+                self.audio_queue.append(audio_data)
+                self.audio_ready.set()
                 
         except KeyboardInterrupt:
             main_logger.info("Received keyboard interrupt, shutting down")
             if 'process' in locals():
                 process.terminate()
                 process.wait()
+            self.close()
             main_logger.info("Shutdown complete")
         except Exception as e:
             main_logger.error(f"Error in main loop: {str(e)}")
@@ -372,32 +1022,99 @@ class MultiMarketTrader:
             if 'process' in locals():
                 process.terminate()
                 process.wait()
+            self.close()
+
+    def stream_reader(self, process):
+        """Return a function reading up to a given number of PCM bytes from the audio stream"""
+        if isinstance(process, PyAVStream):
+            return process.read
+        # Read the raw pipe directly: each read returns whatever FFmpeg has produced, up to
+        # read_size, without Python's buffered reader blocking until the full size arrives
+        return functools.partial(os.read, process.stdout.fileno())
+
+    def close(self):
+        """Stop accepting trades; trades already submitted finish in the background"""
+        self.trade_pool.shutdown(wait=False)
+        # Flush pending trade and detection files before exiting
+        self.writer.close()
+
+def enable_debug_logging():
+    """Send debug records from every logger to the log files and console"""
+    main_logger.setLevel(logging.DEBUG)
+    trade_logger.setLevel(logging.DEBUG)
+    speech_logger.setLevel(logging.DEBUG)
+    console_handler.setLevel(logging.DEBUG)
+
+def run_trader(url=None, debug=False, log_queue=None, worker_index=0, worker_count=1):
+    """Monitor a single YouTube URL until it stops; also the entry point of each worker process"""
+    if log_queue is not None:
+        forward_logs_to(log_queue)
+    if debug:
+        enable_debug_logging()
+    
+    try:
+        trader = MultiMarketTrader(url, worker_index, worker_count)
+        trader.start()
+    except Exception as e:
+        main_logger.critical(f"Fatal error: {str(e)}")
+        main_logger.critical(traceback.format_exc())
+        return 1
+    
+    return 0
 
 def main():
     """Main entry point with command line argument handling"""
     parser = argparse.ArgumentParser(description='Polymarket trading based on YouTube speech recognition')
-    parser.add_argument('--url', type=str, help='YouTube URL to monitor')
+    parser.add_argument('--url', type=str, nargs='+',
+                        help='YouTube URL(s) to monitor; each URL gets its own process and recognizer')
     parser.add_argument('--debug', action='store_true', help='Enable debug logging')
     args = parser.parse_args()
     
     # Override debug setting if provided
     if args.debug:
-        main_logger.setLevel(logging.DEBUG)
-        trade_logger.setLevel(logging.DEBUG)
-        speech_logger.setLevel(logging.DEBUG)
+        enable_debug_logging()
         main_logger.debug("Debug mode enabled via command line")
     
     main_logger.info("Starting application")
     
+    if not args.url or len(args.url) == 1:
+        return run_trader(args.url[0] if args.url else None, args.debug)
+    
+    # Vosk decoding is CPU-bound, so run one trader per process to use one core per stream.
+    # Workers are spawned rather than forked; they only receive the URL and the log queue and
+    # rebuild config, models and clients themselves. Duplicate-trade tracking is per process.
+    context = multiprocessing.get_context('spawn')
+    
+    # Workers forward their records here, so every log file has a single writer that rotates it
+    log_queue = context.Queue()
+    log_listener = QueueListener(log_queue, ForwardedRecordHandler())
+    log_listener.start()
+    if config.get_setting('app', 'record_all_transcripts', False):
+        transcripts_dir = os.path.join(logs_dir, 'transcripts')
+        os.makedirs(transcripts_dir, exist_ok=True)
+        setup_transcript_logger('transcripts', os.path.join(transcripts_dir, 'transcripts.log'))
+    
+    processes = [
+        context.Process(target=run_trader, args=(url, args.debug, log_queue, i, len(args.url)),
+                        name=f"trader-{i}")
+        for i, url in enumerate(args.url)
+    ]
+    for process, url in zip(processes, args.url):
+        process.start()
+        main_logger.info(f"Started {process.name} (pid {process.pid}) for {url}")
+    
     try:
-        trader = MultiMarketTrader(args.url)
-        trader.start()
-    except Exception as e:
-        main_logger.critical(f"Fatal error: {str(e)}")
-        main_logger.critical(traceback.format_exc())
-        return 1
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        # Workers get the same interrupt and shut down on their own
+        main_logger.info("Received keyboard interrupt, waiting for traders to shut down")
+        for process in processes:
+            process.join()
+    finally:
+        log_listener.stop()
     
-    return 0
+    return 0 if all(process.exitcode == 0 for process in processes) else 1
 
 if __name__ == "__main__":
     sys.exit(main())
\ No newline at end of file